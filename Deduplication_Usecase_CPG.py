@@ -3,6 +3,7 @@ import random
 from faker import Faker
 from datetime import datetime, timedelta
 import uuid
+from table_registry import register_tables
 
 # Initialize Faker
 fake = Faker()
@@ -237,7 +238,8 @@ if __name__ == "__main__":
     )
 
     # Save to CSV
-    d_calendar_df.drop(columns=['Date_PK_dt'], errors='ignore').to_csv("D_Calendar.csv", index=False)
+    d_calendar_df_csv = d_calendar_df.drop(columns=['Date_PK_dt'], errors='ignore')
+    d_calendar_df_csv.to_csv("D_Calendar.csv", index=False)
     d_product_df.to_csv("D_Product.csv", index=False)
     d_store_df.to_csv("D_Store.csv", index=False)
     # Convert promo dates back to string for CSV if they are datetime objects
@@ -249,5 +251,9 @@ if __name__ == "__main__":
     f_daily_sales_df.to_csv("F_DailySales.csv", index=False)
     f_shipments_df.to_csv("F_Shipments.csv", index=False)
     f_promotion_applications_df.to_csv("F_PromotionApplications.csv", index=False)
+    register_tables({"D_Calendar.csv": d_calendar_df_csv, "D_Product.csv": d_product_df, "D_Store.csv": d_store_df,
+                     "D_Promotion.csv": d_promotion_df_csv, "F_DailySales.csv": f_daily_sales_df,
+                     "F_Shipments.csv": f_shipments_df, "F_PromotionApplications.csv": f_promotion_applications_df},
+                    "Deduplication_Usecase_CPG.py")
 
 
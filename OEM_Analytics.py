@@ -2,7 +2,9 @@ import pandas as pd
 import numpy as np
 from faker import Faker
 import random
-from datetime import datetime, timedelta
+from datetime import datetime
+from date_sampler import sample_datetimes_between
+from table_registry import register_tables
 
 # Initialize Faker for generating synthetic data
 fake = Faker()
@@ -31,11 +33,9 @@ IS_FIRST_OWNER_OPTIONS = ['Yes', 'No']
 
 
 # --- Helper Functions ---
-def generate_service_date(start, end):
-    """Generates a random date within a given range."""
-    return start + timedelta(
-        seconds=random.randint(0, int((end - start).total_seconds())),
-    )
+def generate_service_dates(start, end, size):
+    """Generates `size` random timestamps within a given range in one draw."""
+    return pd.DatetimeIndex(sample_datetimes_between(start, end, size))
 
 def introduce_patterns(row):
     """
@@ -91,11 +91,12 @@ def introduce_patterns(row):
 # --- Main Data Generation ---
 print("Generating extended synthetic after-sales performance data...")
 data = []
+service_dates = generate_service_dates(START_DATE, END_DATE, NUM_RECORDS)
 for i in range(NUM_RECORDS):
     model = random.choice(VEHICLE_MODELS)
     part_name = random.choice(ALL_PARTS)
     supplier = random.choice(PART_SUPPLIERS[part_name])
-    service_date = generate_service_date(START_DATE, END_DATE)
+    service_date = service_dates[i]
 
     record = {
         'ServiceID': f'SID-{10000 + i}',
@@ -147,6 +148,7 @@ df = df[final_columns]
 # Save to CSV
 output_filename = 'after_sales_performance_extended.csv'
 df.to_csv(output_filename, index=False)
+register_tables({output_filename: df}, "OEM_Analytics.py")
 
 print(f"Successfully generated {len(df)} records.")
 print(f"Dataset saved to '{output_filename}'")
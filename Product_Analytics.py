@@ -3,6 +3,7 @@ import numpy as np
 from datetime import datetime, timedelta
 import random
 import os
+from table_registry import register_tables
 
 # --- Configuration ---
 NUM_USERS = 2000
@@ -163,6 +164,13 @@ df_dim_features.to_csv(os.path.join(output_dir, 'dim_features.csv'), index=False
 df_bridge_page_feature_area.to_csv(os.path.join(output_dir, 'bridge_page_feature_area.csv'), index=False)
 df_fact_user_page_views.to_csv(os.path.join(output_dir, 'fact_user_page_views.csv'), index=False)
 df_fact_user_actions.to_csv(os.path.join(output_dir, 'fact_user_actions.csv'), index=False)
+register_tables({os.path.join(output_dir, 'dim_users.csv'): df_dim_users,
+                 os.path.join(output_dir, 'dim_pages.csv'): df_dim_pages,
+                 os.path.join(output_dir, 'dim_feature_areas.csv'): df_dim_feature_areas,
+                 os.path.join(output_dir, 'dim_features.csv'): df_dim_features,
+                 os.path.join(output_dir, 'bridge_page_feature_area.csv'): df_bridge_page_feature_area,
+                 os.path.join(output_dir, 'fact_user_page_views.csv'): df_fact_user_page_views,
+                 os.path.join(output_dir, 'fact_user_actions.csv'): df_fact_user_actions}, "Product_Analytics.py")
 
 print("\nCSV files generated successfully in the 'product_analytics_test_data' directory.")
 print("You can now import these CSVs into your analytics tool to create your data model and test the charts.")
@@ -210,7 +218,7 @@ print("        - Dimensions: `Dim_FeatureAreas.FeatureAreaName`, `Dim_Pages.Page
 print("        - Crucially, observe page view counts when a PageName is linked to multiple FeatureAreas to verify correct aggregation.")
 print("      - **Histogram:**")
 print("        - Measure: `Fact_UserPageViews.DurationSeconds`")
-        - This will show the distribution of time users spend on pages.
+print("        - This will show the distribution of time users spend on pages.")
 print("\n   C. Advanced Analytics & Filters Testing (YoY, Filters)")
 print("      - **Growth (Year Over Year):**")
 print("        - Apply this to the Line chart of `COUNT(DISTINCT Fact_UserPageViews.UserID)` over `Timestamp`.")
@@ -220,6 +228,6 @@ print("        - Add a filter for `Dim_Users.UserSegment`.")
 print("        - Select multiple segments (e.g., 'Free Tier', 'Premium') and observe charts updating.")
 print("      - **Range Slider Filter:**")
 print("        - Add a filter for `Fact_UserPageViews.Timestamp`.")
-        - Adjust the date range and verify all charts filter correctly.
+print("        - Adjust the date range and verify all charts filter correctly.")
 
 print("\nThis setup provides a comprehensive framework to test your analytics tool's capabilities in handling complex product and user data, with a strong focus on accurate aggregation in the presence of fan-out relationships.")
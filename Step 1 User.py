@@ -1,16 +1,46 @@
 import pandas as pd
 import numpy as np
 from faker import Faker
-from datetime import datetime, timedelta
+from datetime import datetime
+from date_sampler import sample_dates_between
+from column_dag import ColumnGraph
+import credit_io
+from table_registry import TableRegistry
 
 #Please Add number of records required below
 number_of_records=5000
 
 
+# Function to split an id range [low, high) into num_shards disjoint sub-ranges and return one of them
+def shard_range(low, high, shard=0, num_shards=1):
+    step = (high - low) // num_shards
+    return low + shard * step, low + (shard + 1) * step if shard < num_shards - 1 else high
+
+
+# Function to draw `size` distinct ids from [low, high) in random order
+def unique_ids(low, high, size, rng):
+    if size > high - low:
+        raise ValueError(f"Cannot draw {size} distinct ids from a range of {high - low}")
+    if 2 * size > high - low:
+        return low + rng.permutation(high - low)[:size]
+    # Sparse draw: redraw only the collisions instead of materializing the whole range
+    ids = np.unique(rng.randint(low, high, size=size))
+    while len(ids) < size:
+        ids = np.unique(np.r_[ids, rng.randint(low, high, size=size - len(ids))])
+    rng.shuffle(ids)
+    return ids
+
+
 class SyntheticDataGenerator:
-    def __init__(self, num_rows=number_of_records):
+    def __init__(self, num_rows=number_of_records, rng=None, shard=0, num_shards=1, reference_date=None):
         self.fake = Faker()
         self.num_rows = num_rows
+        self.rng = np.random if rng is None else rng
+        # Each shard draws ids from its own disjoint range
+        self.customer_id_range = shard_range(100000000, 999999999, shard, num_shards)
+        self.sk_id_range = shard_range(10000000, 99999999, shard, num_shards)
+        # Ages are measured from this date (today by default); fix it for reproducible reruns
+        self.reference_date = pd.Timestamp(datetime.today().date() if reference_date is None else reference_date)
         self.primary_keys = {}
         self.employment_types = ["Manager", "Laborer", "Self Employed", "Business", "Farmer", "Government Employee", "Unemployed", "Pensioner", "Private Employee", "Contract"]
         self.organization_types = ["Technology", "Healthcare", "Manufacturing", "Education", "Agriculture & Food", "Government Services", "Unknown", "Private", "Franchise"]
@@ -40,112 +70,130 @@ class SyntheticDataGenerator:
         }
         self.marital_status_options = ["Single", "Married", "Separated", "Widow"]
         self.marital_status_probs = [0.3, 0.5, 0.1, 0.1]  # Unequal ratio
+        self.organization_choices = ["Technology", "Healthcare", "Manufacturing", "Education", "Private", "Franchise"]
+        self.organization_probs = [0.2, 0.15, 0.2, 0.15, 0.2, 0.1]
+        self.fixed_organizations = {"Pensioner": "Government Services", "Unemployed": "Unknown", "Farmer": "Agriculture & Food"}
+        self.loan_weekday_probs = {0: 0.25, 1: 0.2, 2: 0.15, 3: 0.15, 4: 0.1, 5: 0.14, 6: 0.01}
     
-    def assign_education_level(self, employment_type):
-        if np.random.rand() < 0.2:  # 20% chance of assigning an exception
-            return np.random.choice(self.exceptions[employment_type])
-        return self.education_levels[employment_type]
-    
-    def assign_organization_type(self, employment_type):
-        if employment_type == "Pensioner":
-            return "Government Services"
-        elif employment_type == "Unemployed":
-            return "Unknown"
-        elif employment_type == "Farmer":
-            return "Agriculture & Food"
-        else:
-            return np.random.choice(["Technology", "Healthcare", "Manufacturing", "Education", "Private", "Franchise"], p=[0.2, 0.15, 0.2, 0.15, 0.2, 0.1])
-    
-    def generate_loan_application_date(self):
-        start_date = datetime(2020, 1, 1)
-        end_date = datetime(2025, 1, 1)
-        
-        # Define probabilities for each day of the week (Sunday is least likely)
-        date_counts = {0: 0.25, 1: 0.2, 2: 0.15, 3: 0.15, 4: 0.1, 5: 0.14, 6: 0.01}  
-        
-        dates = []
-        for _ in range(self.num_rows):
-            while True:
-                random_days = np.random.randint(0, (end_date - start_date).days)
-                loan_date = start_date + timedelta(days=random_days)
-                
-                # Apply probability filtering based on the day of the week
-                if np.random.rand() < date_counts[loan_date.weekday()]:
-                    dates.append(loan_date.strftime("%m/%d/%Y"))  # Ensure YYYY format
-                    break
-                    
-        return dates
-    
+    def birth_date_array(self, employment_type_data, rng=None):
+        # Same age bands as Faker's date_of_birth: pensioners 62-70, everyone else 24-61
+        today = self.reference_date
 
-    
-    def generate_column(self, col_name, col_type, employment_type_data=None, dob_data=None, marital_status_data=None, children_data=None, loan_date_data=None):
+        def age_band(minimum_age, maximum_age):
+            start = today - pd.DateOffset(years=maximum_age + 1) + pd.Timedelta(days=1)
+            return start.to_datetime64(), (today - pd.DateOffset(years=minimum_age)).to_datetime64()
+
+        pensioner = np.asarray(employment_type_data) == "Pensioner"
+        pensioner_start, pensioner_end = age_band(62, 70)
+        other_start, other_end = age_band(24, 61)
+        start = np.where(pensioner, pensioner_start, other_start)
+        end = np.where(pensioner, pensioner_end, other_end)
+        return sample_dates_between(start, end, rng=self.rng if rng is None else rng)
+
+    def generate_column_array(self, col_type, employment_type_data=None, dob_data=None, marital_status_data=None, children_data=None, loan_date_data=None, rng=None):
+        """
+        Returns the column `col_type` as a NumPy array for all rows.
+        Dates (date_of_birth, loan_application_date) are returned as datetime64[ns].
+        rng: the column's own random generator (default: the generator's rng).
+        """
+        n = self.num_rows
+        rng = self.rng if rng is None else rng
         if col_type == 'customer_id':
-            return [np.random.randint(100000000, 999999999) for _ in range(self.num_rows)]
+            return unique_ids(*self.customer_id_range, n, rng)
         elif col_type == 'sk_id_curr':
-            return [f"CB{np.random.randint(10000000, 99999999)}" for _ in range(self.num_rows)]
+            return np.char.add("CB", unique_ids(*self.sk_id_range, n, rng).astype(str)).astype(object)
         elif col_type == 'employment_type':
-            return np.random.choice(self.employment_types, self.num_rows).tolist()
+            return np.array(self.employment_types, dtype=object)[rng.randint(0, len(self.employment_types), size=n)]
         elif col_type == 'education_qualification':
-            return [self.assign_education_level(emp) for emp in employment_type_data]
+            emp = np.asarray(employment_type_data, dtype=object)
+            education = pd.Series(emp).map(self.education_levels).to_numpy(dtype=object)
+            exception = rng.rand(n) < 0.2  # 20% chance of assigning an exception
+            for emp_type, options in self.exceptions.items():
+                mask = exception & (emp == emp_type)
+                education[mask] = np.array(options, dtype=object)[rng.randint(0, len(options), size=mask.sum())]
+            return education
         elif col_type == 'organization_type':
-            return [self.assign_organization_type(emp) for emp in employment_type_data]
+            emp = np.asarray(employment_type_data, dtype=object)
+            organization = rng.choice(self.organization_choices, size=n, p=self.organization_probs).astype(object)
+            for emp_type, org in self.fixed_organizations.items():
+                organization[emp == emp_type] = org
+            return organization
         elif col_type == 'gender':
-            return np.random.choice(['Male', 'Female'], self.num_rows, p=[0.7, 0.3]).tolist()
+            return rng.choice(['Male', 'Female'], n, p=[0.7, 0.3]).astype(object)
         elif col_type == 'date_of_birth':
-            return [
-                self.fake.date_of_birth(minimum_age=62, maximum_age=70).strftime("%m-%d-%Y") if emp == "Pensioner" else 
-                self.fake.date_of_birth(minimum_age=24, maximum_age=61).strftime("%m-%d-%Y")
-                for emp in employment_type_data
-            ]
+            return self.birth_date_array(employment_type_data, rng)
         elif col_type == 'marital_status':
-            return [
-                "Single" if int(dob.split('-')[-1]) > 1998 else 
-                ("Single" if int(dob.split('-')[-1]) > 1994 and np.random.rand() < 0.3 else np.random.choice(self.marital_status_options, p=self.marital_status_probs))
-                for dob in dob_data
-            ]
+            birth_year = pd.DatetimeIndex(dob_data).year.to_numpy()
+            marital = rng.choice(self.marital_status_options, size=n, p=self.marital_status_probs).astype(object)
+            marital[(birth_year > 1994) & (rng.rand(n) < 0.3)] = "Single"
+            marital[birth_year > 1998] = "Single"
+            return marital
         elif col_type == 'no_of_children':
-            return [
-                0 if marital == "Single" else np.random.choice([0, 1, 2, 3, 4, 5], p=[0.4, 0.3, 0.15, 0.1, 0.04, 0.01])
-                for marital in marital_status_data
-            ]
+            children = rng.choice([0, 1, 2, 3, 4, 5], size=n, p=[0.4, 0.3, 0.15, 0.1, 0.04, 0.01])
+            children[np.asarray(marital_status_data) == "Single"] = 0
+            return children
         elif col_type == 'number_of_family':
-            return [children + np.random.choice([1, 2, 3, 4]) for children in children_data]
+            return np.asarray(children_data) + rng.choice([1, 2, 3, 4], size=n)
         elif col_type == 'loan_application_date':
-            return self.generate_loan_application_date()
+            # Weekday-weighted draw between 2020-01-01 and 2024-12-31
+            return sample_dates_between(datetime(2020, 1, 1), datetime(2024, 12, 31), n, weekday_probs=self.loan_weekday_probs, rng=rng)
         elif col_type == 'day_of_week':
-            return [datetime.strptime(date, "%m/%d/%Y").strftime("%A") for date in loan_date_data]
+            return pd.DatetimeIndex(loan_date_data).day_name().to_numpy(dtype=object)
         elif col_type == 'loan_type':
-            return np.random.choice(["Cash Loan", "Revolving Loan"], self.num_rows, p=[0.95, 0.05]).tolist()
+            return rng.choice(["Cash Loan", "Revolving Loan"], n, p=[0.95, 0.05]).astype(object)
         else:
-            return [self.fake.word() for _ in range(self.num_rows)]
+            return np.array([self.fake.word() for _ in range(n)], dtype=object)
+
+# Function to give every column its own random generator, spawned from one SeedSequence seeded by `rng`,
+# so concurrently computed columns never share RNG state and the output does not depend on scheduling
+def column_rngs(rng, names):
+    seed_seq = np.random.SeedSequence(rng.randint(0, 2**32, size=4, dtype=np.uint32))
+    return {name: np.random.RandomState(np.random.MT19937(child)) for name, child in zip(names, seed_seq.spawn(len(names)))}
+
+
+USER_COLUMNS = ["customer_id", "sk_id_curr", "employment_type", "education_qualification", "organization_type", "gender",
+                "date_of_birth", "marital_status", "no_of_children", "number_of_family", "loan_application_date",
+                "day_of_week", "loan_type"]
+
+
+# Function to declare the users table as a column-dependency graph (column order = output order)
+def build_users_graph(generator):
+    rngs = column_rngs(generator.rng, USER_COLUMNS)
+
+    def col(col_type, **inputs):
+        return generator.generate_column_array(col_type, rng=rngs[col_type], **inputs)
+
+    graph = ColumnGraph()
+    graph.add("customer_id", lambda: col("customer_id"))
+    graph.add("sk_id_curr", lambda: col("sk_id_curr"))
+    graph.add("employment_type", lambda: col("employment_type"))
+    graph.add("education_qualification", lambda emp: col("education_qualification", employment_type_data=emp), inputs=["employment_type"])
+    graph.add("organization_type", lambda emp: col("organization_type", employment_type_data=emp), inputs=["employment_type"])
+    graph.add("gender", lambda: col("gender"))
+    graph.add("date_of_birth", lambda emp: col("date_of_birth", employment_type_data=emp), inputs=["employment_type"])
+    graph.add("marital_status", lambda dob: col("marital_status", dob_data=dob), inputs=["date_of_birth"])
+    graph.add("no_of_children", lambda marital: col("no_of_children", marital_status_data=marital), inputs=["marital_status"])
+    graph.add("number_of_family", lambda children: col("number_of_family", children_data=children), inputs=["no_of_children"])
+    graph.add("loan_application_date", lambda: col("loan_application_date"))
+    graph.add("day_of_week", lambda loan_date: col("day_of_week", loan_date_data=loan_date), inputs=["loan_application_date"])
+    graph.add("loan_type", lambda: col("loan_type"))
+    return graph
+
+# Function to generate the users table (used by credit_pipeline.py and by the example below)
+def generate_users(num_rows=number_of_records, rng=None, shard=0, num_shards=1, reference_date=None):
+    generator = SyntheticDataGenerator(num_rows=num_rows, rng=rng, shard=shard, num_shards=num_shards, reference_date=reference_date)
+
+    # Generate the columns for the dataframe as whole-column arrays, scheduled by their dependencies
+    # Dates stay datetime64 here; credit_io.write_csv formats them on write
+    # Every column draws from its own generator, so computing them concurrently keeps the output reproducible
+    return pd.DataFrame(build_users_graph(generator).run())
 
 # Example Usage
-generator = SyntheticDataGenerator(num_rows=number_of_records)
-
-# Generate the columns for the dataframe
-employment_data = generator.generate_column('employment_type', 'employment_type')
-dob_data = generator.generate_column('date_of_birth', 'date_of_birth', employment_type_data=employment_data)
-marital_data = generator.generate_column('marital_status', 'marital_status', dob_data=dob_data)
-children_data = generator.generate_column('no_of_children', 'no_of_children', marital_status_data=marital_data)
-loan_dates = generator.generate_column('loan_application_date', 'loan_application_date')
-
-# Construct the DataFrame with all required columns
-users_df = pd.DataFrame({
-    "customer_id": generator.generate_column("customer_id", "customer_id"),
-    "sk_id_curr": generator.generate_column("sk_id_curr", "sk_id_curr"),
-    "employment_type": employment_data,
-    "education_qualification": generator.generate_column("education_qualification", "education_qualification", employment_type_data=employment_data),
-    "organization_type": generator.generate_column("organization_type", "organization_type", employment_type_data=employment_data),
-    "gender": generator.generate_column("gender", "gender"),
-    "date_of_birth": dob_data,
-    "marital_status": marital_data,
-    "no_of_children": children_data,
-    "number_of_family": generator.generate_column("number_of_family", "number_of_family", children_data=children_data),
-    "loan_application_date": loan_dates,
-    "day_of_week": generator.generate_column("day_of_week", "day_of_week", loan_date_data=loan_dates),
-    "loan_type": generator.generate_column("loan_type", "loan_type")
-})
-
-# Save the dataframe to CSV
-users_df.to_csv('users.csv', index=False)
-print("Users table saved to users.csv")
+if __name__ == "__main__":
+    users_df = generate_users(number_of_records)
+
+    # Save the dataframe to CSV
+    registry = TableRegistry()
+    credit_io.write_csv(users_df, "users.csv", registry, "Step 1 User.py")
+    registry.save()
+    print("Users table saved to users.csv")
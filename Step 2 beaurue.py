@@ -1,101 +1,127 @@
+import os
 import pandas as pd
 import numpy as np
-from datetime import timedelta
-
-def generate_credit_bureau_data(df):
-   
-    num_records_per_id = np.random.choice([1, 2, 3, 4], size=len(df), p=[0.5, 0.3, 0.15, 0.05])  # Weighted distribution
-    no_bureau_ids = np.random.choice(df.index, size=int(0.10 * len(df)), replace=False)  # 10% won't have a record
-
-    records = []
-    for idx, row in df.iterrows():
-        if idx in no_bureau_ids:
-            continue  # Skip 10% of sk_id_curr
-
-        for _ in range(num_records_per_id[idx]):
-            sk_bureau_id = np.random.randint(100000000, 999999999)  # 9-digit ID
-            emp_type = row["employment_type"]
-            loan_app_date = row["loan_application_date"]
-
-            # Assign credit type based on employment
-            if emp_type == "Farmer":
-                credit_type = np.random.choice(["Kisan Credit Card (KCC) Loan", "Agriculture Loan", "Gold Loan", "Home Loan"])
-            elif emp_type == "Laborer":
-                credit_type = np.random.choice(["Gold Loan", "Personal Loan", "Credit Card Loan", "Consumer Durable Loan"])
-            else:
-                credit_type = np.random.choice(["Gold Loan", "Education Loan", "Personal Loan", "Credit Card Loan",
-                                                "Consumer Durable Loan", "Home Loan", "Credit Against Land"])
-
-            # Determine credit application date (person should be at least 20 years old)
-            max_credit_years_ago = max(1, min(20, (loan_app_date - row.date_of_birth).days // 365 - 20))
-            days_before_loan = np.random.randint(0, max_credit_years_ago * 365)
-            credit_app_date = loan_app_date - timedelta(days=days_before_loan)
-
-            # Assign loan tenure based on type
-            tenure_ranges = {
-                "Gold Loan": (1, 5),
-                "Agriculture Loan": (2, 7),
-                "Education Loan": (3, 10),
-                "Personal Loan": (1, 5),
-                "Credit Card Loan": (1, 10),
-                "Consumer Durable Loan": (1, 3),
-                "Kisan Credit Card (KCC) Loan": (1, 5),
-                "Startup India Loan": (2, 7),
-                "Home Loan": (10, 30),
-                "Credit Against Land": (5, 15),
-            }
-            tenure_years = np.random.uniform(*tenure_ranges[credit_type])
-            loan_end_date = credit_app_date + timedelta(days=int(tenure_years * 365))
-
-            # Determine credit active status
-            credit_active_status = "Active" if loan_end_date > loan_app_date else "Closed"
-
-            # Assign credit prolongation (10% of records)
-            prolongation = 0
-            if np.random.rand() <= 0.10:  # 10% probability
-                if emp_type in ["Laborer", "Farmer", "Self Employed", "Business"]:
-                    prolongation = np.random.choice([2, 3, 4], p=[0.3, 0.5, 0.2])
-                elif emp_type in ["Private Employee", "Contract"]:
-                    prolongation = np.random.choice([1, 2, 3], p=[0.5, 0.3, 0.2])
-                else:
-                    prolongation = np.random.choice([1, 2], p=[0.7, 0.3])
-
-            records.append({
-                "sk_id_curr": row["sk_id_curr"],
-                "sk_bureau_id": sk_bureau_id,  # 9-digit unique ID
-                "loan_application_date": row["loan_application_date"],
-                "date_of_birth": row["date_of_birth"],
-                "employment_type": row["employment_type"],
-                "credit_active": credit_active_status,
-                "credit_currency": "INR",
-                "days_credit": -(loan_app_date - credit_app_date).days,  # Always negative
-                "credit_day_overdue": (loan_end_date - loan_app_date).days,  # Positive or negative
-                "days_enddate_fact": (loan_app_date - loan_end_date).days if loan_end_date < loan_app_date and credit_active_status == "Closed" else np.nan,
-                "amt_credit_max_overdue": np.random.uniform(0, 10000),
-                "cnt_credit_prolong": prolongation,
-                "amt_credit_sum": np.random.uniform(1000, 50000),
-                "amt_credit_sum_debt": np.random.uniform(0, 50000),
-                "amt_credit_sum_limit": np.random.uniform(0, 20000),
-                "amt_credit_sum_overdue": np.random.uniform(0, 5000),
-                "credit_type": credit_type,              
-                "amt_annuity": np.random.uniform(100, 2000),
-                "months_balance": np.random.randint(-36, 0),
-                "status": np.random.choice(["C", "X", "0", "1", "2", "3", "4", "5"]),
-                "credit_application_date": credit_app_date,
-                "loan_end_date": loan_end_date,
-            })
-
-    return pd.DataFrame(records)
-
-# Load users.csv
-users_df = pd.read_csv("users.csv", parse_dates=["loan_application_date", "date_of_birth"])
-
-# Generate synthetic credit bureau data
-credit_bureau_df = generate_credit_bureau_data(users_df)
-
-
-
-print("✅ Credit Bureau Data with SK_BUREAU_ID, Multiple Records per SK_ID_CURR Saved as 'credit_bureau_data.csv'")
+import credit_io
+from table_registry import TableRegistry
+from derived_rules import DerivedColumn, apply_rules, days_between, lookup, sample_mask
+
+# "snapshot": one bureau_balance row per credit (status + months_balance)
+# "history": the full month-by-month balance history of every active credit, written in chunks
+BUREAU_BALANCE_MODE = "snapshot"
+BALANCE_CHUNK_ROWS = 5_000_000  # history rows held in memory at a time
+
+# Credit types a customer can hold, by employment type (anything else uses DEFAULT_CREDIT_TYPES)
+CREDIT_TYPES_BY_EMPLOYMENT = {
+    "Farmer": ["Kisan Credit Card (KCC) Loan", "Agriculture Loan", "Gold Loan", "Home Loan"],
+    "Laborer": ["Gold Loan", "Personal Loan", "Credit Card Loan", "Consumer Durable Loan"],
+}
+DEFAULT_CREDIT_TYPES = ["Gold Loan", "Education Loan", "Personal Loan", "Credit Card Loan",
+                        "Consumer Durable Loan", "Home Loan", "Credit Against Land"]
+
+# Loan tenure in years by credit type
+tenure_ranges = {
+    "Gold Loan": (1, 5),
+    "Agriculture Loan": (2, 7),
+    "Education Loan": (3, 10),
+    "Personal Loan": (1, 5),
+    "Credit Card Loan": (1, 10),
+    "Consumer Durable Loan": (1, 3),
+    "Kisan Credit Card (KCC) Loan": (1, 5),
+    "Startup India Loan": (2, 7),
+    "Home Loan": (10, 30),
+    "Credit Against Land": (5, 15),
+}
+
+# Number of prolongations (values, probabilities) for the 10% of credits that are prolonged
+PROLONGATION_BY_EMPLOYMENT = [
+    (["Laborer", "Farmer", "Self Employed", "Business"], [2, 3, 4], [0.3, 0.5, 0.2]),
+    (["Private Employee", "Contract"], [1, 2, 3], [0.5, 0.3, 0.2]),
+]
+DEFAULT_PROLONGATION = ([1, 2], [0.7, 0.3])
+
+DAY = np.timedelta64(1, "D")
+
+
+def generate_credit_bureau_data(df, rng=None):
+    """
+    Builds the bureau records for a users frame: each user gets 1-4 credits, 10% get none.
+    Users are expanded to one row per credit with np.repeat and every attribute is drawn
+    for all credits at once.
+    """
+    rng = np.random if rng is None else rng
+    num_users = len(df)
+
+    num_records_per_id = rng.choice([1, 2, 3, 4], size=num_users, p=[0.5, 0.3, 0.15, 0.05])  # Weighted distribution
+    no_bureau_ids = rng.choice(num_users, size=int(0.10 * num_users), replace=False)  # 10% won't have a record
+    num_records_per_id[no_bureau_ids] = 0
+
+    # One row per credit, pointing back at its user
+    user_pos = np.repeat(np.arange(num_users), num_records_per_id)
+    n = len(user_pos)
+    emp_type = df["employment_type"].to_numpy(dtype=object)[user_pos]
+    loan_app_date = df["loan_application_date"].to_numpy(dtype="datetime64[ns]")[user_pos]
+    date_of_birth = df["date_of_birth"].to_numpy(dtype="datetime64[ns]")[user_pos]
+
+    # Assign credit type based on employment
+    credit_types = list(dict.fromkeys(DEFAULT_CREDIT_TYPES + [t for ts in CREDIT_TYPES_BY_EMPLOYMENT.values() for t in ts]))
+    credit_code = np.empty(n, dtype=np.int8)
+    other = np.ones(n, dtype=bool)
+    for emp, options in list(CREDIT_TYPES_BY_EMPLOYMENT.items()) + [(None, DEFAULT_CREDIT_TYPES)]:
+        mask = other if emp is None else emp_type == emp
+        option_codes = np.array([credit_types.index(t) for t in options], dtype=np.int8)
+        credit_code[mask] = option_codes[rng.randint(0, len(options), size=mask.sum())]
+        other &= ~mask
+    credit_type = np.array(credit_types, dtype=object)[credit_code]
+
+    # Determine credit application date (person should be at least 20 years old)
+    age_days = (loan_app_date - date_of_birth) // DAY
+    max_credit_years_ago = np.clip(age_days // 365 - 20, 1, 20)
+    days_before_loan = rng.randint(0, max_credit_years_ago * 365)
+    credit_app_date = loan_app_date - days_before_loan * DAY
+
+    # Assign loan tenure based on type
+    tenure_low = np.array([tenure_ranges[t][0] for t in credit_types], dtype=float)[credit_code]
+    tenure_high = np.array([tenure_ranges[t][1] for t in credit_types], dtype=float)[credit_code]
+    tenure_years = rng.uniform(tenure_low, tenure_high)
+    loan_end_date = credit_app_date + (tenure_years * 365).astype(np.int64) * DAY
+
+    # Determine credit active status
+    is_active = loan_end_date > loan_app_date
+    days_to_end = (loan_end_date - loan_app_date) // DAY
+
+    # Assign credit prolongation (10% of records)
+    prolongation = np.zeros(n, dtype=np.int64)
+    prolonged = rng.rand(n) <= 0.10
+    remaining = prolonged.copy()
+    for emps, values, probs in PROLONGATION_BY_EMPLOYMENT + [(None, *DEFAULT_PROLONGATION)]:
+        mask = remaining if emps is None else remaining & np.isin(emp_type, emps)
+        prolongation[mask] = rng.choice(values, size=mask.sum(), p=probs)
+        remaining &= ~mask
+
+    return pd.DataFrame({
+        "sk_id_curr": df["sk_id_curr"].to_numpy()[user_pos],
+        "sk_bureau_id": rng.randint(100000000, 999999999, size=n),  # 9-digit ID
+        "loan_application_date": loan_app_date,
+        "date_of_birth": date_of_birth,
+        "employment_type": emp_type,
+        "credit_active": np.where(is_active, "Active", "Closed").astype(object),
+        "credit_currency": "INR",
+        "days_credit": -days_before_loan,  # Always negative
+        "credit_day_overdue": days_to_end,  # Positive or negative
+        "days_enddate_fact": np.where(days_to_end < 0, -days_to_end, np.nan),
+        "amt_credit_max_overdue": rng.uniform(0, 10000, size=n),
+        "cnt_credit_prolong": prolongation,
+        "amt_credit_sum": rng.uniform(1000, 50000, size=n),
+        "amt_credit_sum_debt": rng.uniform(0, 50000, size=n),
+        "amt_credit_sum_limit": rng.uniform(0, 20000, size=n),
+        "amt_credit_sum_overdue": rng.uniform(0, 5000, size=n),
+        "credit_type": credit_type,
+        "amt_annuity": rng.uniform(100, 2000, size=n),
+        "months_balance": rng.randint(-36, 0, size=n),
+        "status": np.array(["C", "X", "0", "1", "2", "3", "4", "5"], dtype=object)[rng.randint(0, 8, size=n)],
+        "credit_application_date": credit_app_date,
+        "loan_end_date": loan_end_date,
+    })
 
 loan_amounts = {
     "Home Loan": (20_00_000, 1_00_00_000),
@@ -123,73 +149,6 @@ employment_multipliers = {
     "Contract": 1.0,
 }
 
-# Function to determine amt_credit_sum
-def assign_credit_amount(row):
-    base_range = loan_amounts.get(row["credit_type"], (10_000, 50_000))  # Default range if not found
-    multiplier = employment_multipliers.get(row["employment_type"], 1.0)  # Default multiplier
-    return round(np.random.uniform(base_range[0], base_range[1]) * multiplier, 2)
-
-# Apply function to update amt_credit_sum
-credit_bureau_df["amt_credit_sum"] = credit_bureau_df.apply(assign_credit_amount, axis=1)
-
-
-# Function to calculate AMT_CREDIT_SUM_DEBT
-def calculate_credit_debt(row):
-    if row["credit_active"] == "Closed":
-        return 0  # If loan is closed, debt is 0
-    
-    # Time left for loan repayment
-    time_left = (row["loan_end_date"] - row["loan_application_date"]).days
-    # Total loan duration
-    total_duration = (row["loan_end_date"] - row["credit_application_date"]).days
-
-    # Ensure total_duration is not zero (avoid division by zero)
-    if total_duration <= 0:
-        return 0
-    
-    # Ratio: Lesser the time left, lesser the debt
-    time_left_ratio = max(0, min(1, time_left / total_duration))  # Keep ratio in range [0,1]
-    
-    # Calculate debt based on amt_credit_sum
-    return round(row["amt_credit_sum"] * time_left_ratio, 2)
-
-# Apply the function to create the column AMT_CREDIT_SUM_DEBT
-credit_bureau_df["amt_credit_sum_debt"] = credit_bureau_df.apply(calculate_credit_debt, axis=1)
-
-def calculate_credit_limit(row):
-    if row["credit_type"] == "Credit Card Loan":
-        increase_percentage = np.random.uniform(1.1, 1.5)  # Increase between 10% and 50%
-        new_limit = row["amt_credit_sum"] * increase_percentage
-        
-        # Round up to the nearest multiple of 10,000
-        return int(np.ceil(new_limit / 10000) * 10000)
-    
-    return None  # Keep it empty for other loan types
-
-# Apply function to update AMT_CREDIT_SUM_LIMIT
-credit_bureau_df["amt_credit_sum_limit"] = credit_bureau_df.apply(calculate_credit_limit, axis=1)
-
-
-# Filter records that satisfy conditions: Active status & cnt_credit_prolong > 0
-eligible_indices = credit_bureau_df[
-    (credit_bureau_df["credit_active"] == "Active") &
-    (credit_bureau_df["cnt_credit_prolong"] > 0)
-].index
-
-# Randomly select 30% of these records
-num_records_to_update = int(len(eligible_indices) * 0.3)
-selected_indices = np.random.choice(eligible_indices, num_records_to_update, replace=False)
-
-# Function to update amt_credit_sum_overdue
-def update_overdue(row):
-    if row.name in selected_indices:
-        # Apply 10% to 50% of AMT_CREDIT_SUM_DEBT
-        return round(row["amt_credit_sum_debt"] * np.random.uniform(0.1, 0.5), 2)
-    return 0  # Default value for other records
-
-# Apply function
-credit_bureau_df["amt_credit_sum_overdue"] = credit_bureau_df.apply(update_overdue, axis=1)
-
 interest_rates = {
     "Home Loan": 8.5,
     "Personal Loan": 12.0,
@@ -203,65 +162,204 @@ interest_rates = {
     "Credit Against Land": 10.5
 }
 
-def calculate_emi(row):
-    if row["credit_active"] != "Active":
-        return None  # EMI is not applicable for closed loans
-
-    P = row["amt_credit_sum"]
-    rate_annual = interest_rates.get(row["credit_type"], 10.0)  # Default interest rate if not found
-    rate_monthly = rate_annual / 12 / 100  # Convert annual rate to monthly rate
-    
-    # Loan tenure in months
-    tenure_months = max(1, (row["loan_end_date"] - row["credit_application_date"]).days // 30)  # Avoid zero division
-    
-    # EMI formula
-    if rate_monthly > 0:
-        emi = (P * rate_monthly * (1 + rate_monthly) ** tenure_months) / ((1 + rate_monthly) ** tenure_months - 1)
-    else:
-        emi = P / tenure_months  # If interest rate is 0, simple division
-
-    return round(emi, 2)
-
-# Apply function to calculate amt_annuity (EMI)
-credit_bureau_df["amt_annuity"] = credit_bureau_df.apply(calculate_emi, axis=1)
-
-def calculate_months_balance(row):
-    if row["credit_active"] == "Active":
-        months_diff = (row["loan_end_date"] - row["loan_application_date"]).days // 30
-        return -abs(months_diff)  # Ensure it's negative
-    return None  # Keep as None for Closed accounts
-
-
-credit_bureau_df["months_balance"] = credit_bureau_df.apply(calculate_months_balance, axis=1)
-
 status_options = ["X", "1", "2", "3", "4", "5"]
 
 
-def update_status(row):
-    if row["credit_active"] == "Closed":
-        return "C"
-    elif row["cnt_credit_prolong"] and row["cnt_credit_prolong"] > 0:
-        return np.random.choice(status_options)
-    return None  # Keep None if amt_annuity is 0 or missing
+# --- Business rules, in evaluation order (later rules see the columns derived before them) ---
+def credit_amount(c, rng):
+    # Loan amount range by credit type, scaled by employment
+    low = lookup(c["credit_type"], {k: v[0] for k, v in loan_amounts.items()}, 10_000)
+    high = lookup(c["credit_type"], {k: v[1] for k, v in loan_amounts.items()}, 50_000)
+    multiplier = lookup(c["employment_type"], employment_multipliers, 1.0)
+    return np.round(rng.uniform(low, high) * multiplier, 2)
+
+
+def credit_debt(c, rng):
+    # Ratio: lesser the time left, lesser the debt
+    time_left = days_between(c["loan_application_date"], c["loan_end_date"])
+    total_duration = days_between(c["credit_application_date"], c["loan_end_date"])
+    time_left_ratio = np.clip(time_left / np.where(total_duration > 0, total_duration, 1), 0, 1)
+    return np.round(c["amt_credit_sum"] * time_left_ratio, 2)
 
 
-credit_bureau_df["status"] = credit_bureau_df.apply(update_status, axis=1)
-
-# Round amt_credit_max_overdue to 2 decimal places
-credit_bureau_df["amt_credit_max_overdue"] = credit_bureau_df["amt_credit_max_overdue"].round(2)
-
-
-
-#######################################################################################################################
-#Creating a new df for bureau_balance dataset
-bureau_balance_df = credit_bureau_df[['sk_bureau_id', 'status', 'months_balance']]  
-
-# Save the new DataFrame to a CSV file
-bureau_balance_df.to_csv('bureau_balance.csv', index=False) 
-
-
-credit_bureau_df = credit_bureau_df.drop(columns=['loan_end_date', 'status', 'months_balance','credit_application_date','loan_application_date','employment_type','date_of_birth'])  # Remove columns a, b, c
-
-
-# Save to CSV
-credit_bureau_df.to_csv("bureau.csv", index=False)
\ No newline at end of file
+def credit_limit(c, rng):
+    # Increase between 10% and 50%, rounded up to the nearest multiple of 10,000
+    new_limit = c["amt_credit_sum"] * rng.uniform(1.1, 1.5, size=len(c["amt_credit_sum"]))
+    return np.ceil(new_limit / 10000) * 10000
+
+
+def overdue_selected(c, rng):
+    # Exactly 30% of the active, prolonged credits are overdue
+    return sample_mask((c["credit_active"] == "Active") & (c["cnt_credit_prolong"] > 0), 0.3, rng)
+
+
+def emi(c, rng):
+    P = c["amt_credit_sum"]
+    rate_monthly = lookup(c["credit_type"], interest_rates, 10.0) / 12 / 100  # Convert annual rate to monthly rate
+    # Loan tenure in months (at least 1 to avoid zero division)
+    tenure_months = np.maximum(1, days_between(c["credit_application_date"], c["loan_end_date"]) // 30)
+    growth = (1 + rate_monthly) ** tenure_months
+    with np.errstate(divide="ignore", invalid="ignore"):
+        amortized = (P * rate_monthly * growth) / (growth - 1)
+    return np.round(np.where(rate_monthly > 0, amortized, P / tenure_months), 2)
+
+
+def is_active(c, rng):
+    return c["credit_active"] == "Active"
+
+
+def is_closed(c, rng):
+    return c["credit_active"] == "Closed"
+
+
+BUREAU_RULES = [
+    DerivedColumn("amt_credit_sum", [(None, credit_amount)]),
+    # If the loan is closed (or has no duration) the debt is 0
+    DerivedColumn("amt_credit_sum_debt", [
+        (is_closed, lambda c, rng: 0.0),
+        (lambda c, rng: days_between(c["credit_application_date"], c["loan_end_date"]) <= 0, lambda c, rng: 0.0),
+        (None, credit_debt),
+    ]),
+    # Only credit cards have a limit
+    DerivedColumn("amt_credit_sum_limit", [(lambda c, rng: c["credit_type"] == "Credit Card Loan", credit_limit)]),
+    # 10% to 50% of the outstanding debt for the selected overdue credits
+    DerivedColumn("amt_credit_sum_overdue", [
+        (overdue_selected, lambda c, rng: np.round(c["amt_credit_sum_debt"] * rng.uniform(0.1, 0.5, size=len(c["amt_credit_sum_debt"])), 2)),
+    ], default=0.0),
+    # EMI is not applicable for closed loans
+    DerivedColumn("amt_annuity", [(is_active, emi)]),
+    DerivedColumn("months_balance", [
+        (is_active, lambda c, rng: -np.abs(days_between(c["loan_application_date"], c["loan_end_date"]) // 30)),
+    ]),
+    DerivedColumn("status", [
+        (is_closed, lambda c, rng: "C"),
+        (lambda c, rng: c["cnt_credit_prolong"] > 0,
+         lambda c, rng: np.array(status_options, dtype=object)[rng.randint(0, len(status_options), size=len(c["status"]))]),
+    ], default=None),
+]
+
+
+# Function to generate the bureau credits (with every helper column) from the users table
+def generate_bureau_credits(users_df, rng=None):
+    # Generate synthetic credit bureau data
+    credit_bureau_df = generate_credit_bureau_data(users_df, rng)
+
+    # Apply the business rules to the generated records in one pass
+    credit_bureau_df = apply_rules(credit_bureau_df, BUREAU_RULES, rng)
+
+    # Round amt_credit_max_overdue to 2 decimal places
+    credit_bureau_df["amt_credit_max_overdue"] = credit_bureau_df["amt_credit_max_overdue"].round(2)
+    return credit_bureau_df
+
+
+# Function to split the credits into the bureau and (snapshot) bureau_balance tables
+def split_bureau_tables(credit_bureau_df):
+    #Creating a new df for bureau_balance dataset
+    bureau_balance_df = credit_bureau_df[['sk_bureau_id', 'status', 'months_balance']]
+
+    credit_bureau_df = credit_bureau_df.drop(columns=['loan_end_date', 'status', 'months_balance','credit_application_date','loan_application_date','employment_type','date_of_birth'])  # Remove columns a, b, c
+    return credit_bureau_df, bureau_balance_df
+
+
+# Function to aggregate the credits per customer, so later steps need not regroup bureau.csv
+def summarize_credits(credit_bureau_df):
+    codes, customer_ids = pd.factorize(credit_bureau_df["sk_id_curr"])
+    size = len(customer_ids)
+    annuity = np.nan_to_num(credit_bureau_df["amt_annuity"].to_numpy(dtype=float))  # closed credits have no EMI
+    home_loans = (credit_bureau_df["credit_type"] == "Home Loan").to_numpy()
+    return pd.DataFrame({
+        "sk_id_curr": customer_ids,
+        "amt_annuity": np.bincount(codes, weights=annuity, minlength=size).round(2),
+        "cnt_credit_prolong": np.bincount(codes, weights=credit_bureau_df["cnt_credit_prolong"].to_numpy(), minlength=size).astype(np.int64),
+        "has_home_loan": np.bincount(codes, weights=home_loans, minlength=size) > 0,
+        "credit_count": np.bincount(codes, minlength=size),
+    })
+
+
+def build_bureau_tables(users_df, rng=None):
+    return split_bureau_tables(generate_bureau_credits(users_df, rng))
+
+
+# --- Monthly bureau_balance history ---
+def iter_balance_history(credit_bureau_df, chunk_rows=BALANCE_CHUNK_ROWS, rng=None):
+    """
+    Yields the month-by-month history of every active credit as DataFrames of at most
+    ~chunk_rows rows (sk_bureau_id, months_balance, status, amt_balance).
+    Month k = 1..tenure holds the balance left after the k-th EMI, using the same
+    amortization as calculate_emi: B_k = P(1+r)^k - EMI((1+r)^k - 1)/r.
+    months_balance is relative to the loan application month; later months are status "X".
+    Credits with cnt_credit_prolong > 0 get one delinquency spell of that many months
+    in which the status climbs 1, 2, ... 5; every other month is "0".
+    """
+    rng = np.random if rng is None else rng
+    active = credit_bureau_df[credit_bureau_df["credit_active"] == "Active"]
+    c = {col: active[col].to_numpy() for col in ["sk_bureau_id", "credit_type", "amt_credit_sum", "amt_annuity", "cnt_credit_prolong"]}
+
+    tenure = np.maximum(1, days_between(active["credit_application_date"], active["loan_end_date"]) // 30)
+    elapsed = days_between(active["credit_application_date"], active["loan_application_date"]) // 30
+    rate = lookup(c["credit_type"], interest_rates, 10.0) / 12 / 100
+    spell_start = rng.randint(1, tenure + 1)
+    status_codes = np.array(["0", "1", "2", "3", "4", "5", "X"], dtype=object)
+
+    # Cut the credits into runs whose month counts add up to about chunk_rows
+    month_end = np.cumsum(tenure)
+    bounds = np.searchsorted(month_end, np.arange(chunk_rows, month_end[-1] if len(month_end) else 0, chunk_rows), side="right")
+    for lo, hi in zip(np.r_[0, bounds], np.r_[bounds, len(tenure)]):
+        if lo == hi:
+            continue
+        pos = np.repeat(np.arange(lo, hi), tenure[lo:hi])
+        first_row = month_end[lo:hi] - tenure[lo:hi]  # offset of each credit's first month
+        k = np.arange(len(pos)) - np.repeat(first_row - first_row[0], tenure[lo:hi]) + 1
+
+        growth = (1 + rate[pos]) ** k
+        balance = c["amt_credit_sum"][pos] * growth - c["amt_annuity"][pos] * (growth - 1) / rate[pos]
+        months_balance = k - elapsed[pos]
+
+        since_spell = k - spell_start[pos]
+        status = np.where((since_spell >= 0) & (since_spell < c["cnt_credit_prolong"][pos]), np.minimum(since_spell + 1, 5), 0)
+        status[months_balance > 0] = 6
+
+        yield pd.DataFrame({
+            "sk_bureau_id": c["sk_bureau_id"][pos],
+            "months_balance": months_balance,
+            "status": status_codes[status],
+            "amt_balance": np.round(np.maximum(balance, 0), 2),
+        })
+
+
+def write_balance_history(credit_bureau_df, path, chunk_rows=BALANCE_CHUNK_ROWS, rng=None, registry=None, source=None):
+    """
+    Streams iter_balance_history to a CSV, one chunk at a time; returns the number of rows written.
+    registry: optional TableRegistry that collects the table statistics chunk by chunk.
+    """
+    rows = 0
+    if registry is not None:
+        registry.reset(os.path.basename(path))
+    for i, chunk in enumerate(iter_balance_history(credit_bureau_df, chunk_rows, rng)):
+        chunk.to_csv(path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+        if registry is not None:
+            registry.observe(os.path.basename(path), chunk, source)
+        rows += len(chunk)
+    if rows == 0:
+        pd.DataFrame(columns=["sk_bureau_id", "months_balance", "status", "amt_balance"]).to_csv(path, index=False)
+    return rows
+
+
+if __name__ == "__main__":
+    # Load users.csv
+    users_df = credit_io.read_csv("users.csv")
+
+    credits_df = generate_bureau_credits(users_df)
+    credit_bureau_df, bureau_balance_df = split_bureau_tables(credits_df)
+    bureau_summary_df = summarize_credits(credits_df)
+
+    # Save the new DataFrames to CSV files
+    registry = TableRegistry()
+    if BUREAU_BALANCE_MODE == "history":
+        write_balance_history(credits_df, 'bureau_balance.csv', registry=registry, source="Step 2 beaurue.py")
+    else:
+        credit_io.write_csv(bureau_balance_df, 'bureau_balance.csv', registry, "Step 2 beaurue.py")
+    credit_io.write_csv(credit_bureau_df, "bureau.csv", registry, "Step 2 beaurue.py")
+    credit_io.write_csv(bureau_summary_df, "bureau_summary.csv", registry, "Step 2 beaurue.py")
+    registry.save()
+    print("✅ Credit Bureau Data with SK_BUREAU_ID, Multiple Records per SK_ID_CURR Saved as 'bureau.csv'")
@@ -1,19 +1,15 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime
-
-
-# Load the CSV file
-users_df = pd.read_csv("users.csv")
-
-# Generate random Yes/No values for Aadhar and pan_card
-users_df["Aadhar"] = np.random.choice(["Yes", "No"], size=len(users_df))
-users_df["pan_card"] = np.random.choice(["Yes", "No"], size=len(users_df))
+import credit_io
+from derived_rules import lookup
+from cpt_sampler import ConditionalTable, yes_no
+from table_registry import TableRegistry
 
 
 def calculate_age(dob):
     today = datetime.today()
-    return today.year - pd.to_datetime(dob).year
+    return today.year - pd.DatetimeIndex(dob).year.to_numpy()
 
 # Define base income ranges (Monthly Salary in INR) for employment_type
 employment_income = {
@@ -51,153 +47,129 @@ education_multiplier = {
     "Master's": 1.2,
     "PhD": 1.5
 }
-#organization_type
-# Assign total_income
-total_income = []
-
-for _, row in users_df.iterrows():
-    age = calculate_age(row["date_of_birth"])
-    base_salary_range = employment_income.get(row["employment_type"], (10000, 50000))
-    base_salary = np.random.randint(base_salary_range[0], base_salary_range[1])
-    
-    org_type_multiplier = organization_multiplier.get(row["organization_type"], 1.0)
-    edu_multiplier = education_multiplier.get(row["education_qualification"], 1.0)
-    
-    # Adjust based on experience (older people generally earn more)
-    experience_factor = (1 + (age / 100)) if age >= 25 else 1.0
-    
-    # Final salary calculation
-    salary = base_salary * org_type_multiplier * edu_multiplier * experience_factor
-
-    # Introduce noise using normal distribution (mean = 0, std dev = 5% of salary)
-    noise = np.random.normal(loc=0, scale=0.05 * salary)  # 5% variation
-    
-    # Add a small random fluctuation in range (-10% to +10%)
-    fluctuation = salary * np.random.uniform(-0.1, 0.1)
-    
-    final_salary = salary + noise + fluctuation
-    total_income.append(int(final_salary))  # Convert to integer for readability
-
-# Add to DataFrame
-users_df["total_income_monthly"] = total_income
-
-
-# Load bureau.csv
-bureau_df = pd.read_csv("bureau.csv")
-
-# Aggregate amt_annuity by summing it per sk_id_curr
-bureau_annuity = bureau_df.groupby("sk_id_curr")["amt_annuity"].sum().reset_index()
 
-# Rename column for merging
-bureau_annuity = bureau_df.groupby("sk_id_curr")["amt_annuity"].sum().round(2).reset_index()
+# Function to compute total_income_monthly for every user at once
+def income_model(users_df, rng=None):
+    rng = np.random if rng is None else rng
+    age = calculate_age(users_df["date_of_birth"])
+    base_low = lookup(users_df["employment_type"], {k: v[0] for k, v in employment_income.items()}, 10000)
+    base_high = lookup(users_df["employment_type"], {k: v[1] for k, v in employment_income.items()}, 50000)
+    base_salary = rng.randint(base_low, base_high)
 
+    org_type_multiplier = lookup(users_df["organization_type"], organization_multiplier, 1.0)
+    edu_multiplier = lookup(users_df["education_qualification"], education_multiplier, 1.0)
 
-users_df = users_df.merge(bureau_annuity, on="sk_id_curr", how="left")
-
-# Ensure missing values in amt_annuity_monthly are handled
-users_df["amt_annuity"] = users_df["amt_annuity"].fillna(0)
-
-# Create flag_default column
-users_df["flag_default"] = users_df.apply(
-    lambda row: "Yes" if row["total_income_monthly"] < row["amt_annuity"] else "No", axis=1
-)
+    # Adjust based on experience (older people generally earn more)
+    experience_factor = np.where(age >= 25, 1 + age / 100, 1.0)
 
+    # Final salary calculation
+    salary = base_salary * org_type_multiplier * edu_multiplier * experience_factor
 
+    # Introduce noise using normal distribution (mean = 0, std dev = 5% of salary)
+    noise = rng.normal(loc=0, scale=0.05 * salary)  # 5% variation
 
-bureau_credit_prolong = bureau_df.groupby("sk_id_curr")["cnt_credit_prolong"].sum().reset_index()
+    # Add a small random fluctuation in range (-10% to +10%)
+    fluctuation = salary * rng.uniform(-0.1, 0.1, size=len(salary))
 
-# Perform a left join with users_df
-users_df = users_df.merge(bureau_credit_prolong, on="sk_id_curr", how="left")
+    final_salary = salary + noise + fluctuation
+    return np.trunc(final_salary).astype(np.int64)  # Convert to integer for readability
 
-users_df['month'] = users_df['loan_application_date'].str.split('/').str[0].astype(int)
 
-# Assign quarters based on month number  
-users_df['quarter'] = pd.cut(users_df['month'], 
-                                         bins=[0, 3, 6, 9, 12], 
-                                         labels=['Q1', 'Q2', 'Q3', 'Q4'])
+# flag_default: "Yes" when the annuity exceeds income and the credit was prolonged;
+# when the annuity is over 1.5x income without prolongation the chance depends on the quarter
+def _annuity_stress(c):
+    return (c["amt_annuity"] > 1.5 * c["total_income_monthly"]) & (c["cnt_credit_prolong"] == 0)
 
-# Drop the extra month column if not needed  
-users_df.drop(columns=['month'], inplace=True)
 
+default_flag_table = ConditionalTable(["Yes", "No"], [
+    (lambda c: (c["total_income_monthly"] < c["amt_annuity"]) & (c["cnt_credit_prolong"] > 0), [1.0, 0.0]),
+    (lambda c: _annuity_stress(c) & (c["quarter"] == "Q1"), [0.9, 0.1]),
+    (lambda c: _annuity_stress(c) & (c["quarter"] == "Q2"), [0.3, 0.7]),
+    (lambda c: _annuity_stress(c) & (c["quarter"] == "Q3"), [0.6, 0.4]),
+    (lambda c: _annuity_stress(c) & (c["quarter"] == "Q4"), [0.1, 0.9]),
+])
 
 
+# Define the five strings
+accompanied = ["Agent", "Family", "Unaccompanied", "Referal", "Unknown"]
 
-# Fill missing values with 0 and ensure integer type
-users_df["cnt_credit_prolong"] = users_df["cnt_credit_prolong"].fillna(0).astype(int)
+# Defaulters come through an agent 40% of the time, otherwise any of the five equally
+accompanied_table = ConditionalTable(accompanied, [
+    (lambda c: c["flag_default"] == "Yes", [0.4 + 0.6 / 5] + [0.6 / 5] * 4),
+], default=[1 / 5] * 5)
+
+# 90% of the users with a home loan own a house
+own_house_table = ConditionalTable(["Yes", "No"], [(lambda c: c["has_home_loan"], [0.9, 0.1])])
+
+# Behavioral Yes/No flags and their P(Yes)
+flag_tables = {
+    "car_flag": yes_no(0.4),
+    "mobile_flag": yes_no(0.8),
+    "email_flag": yes_no(0.6),
+    "insurance_flag": yes_no(0.4),
+    "kyc_flag": yes_no(0.4),
+}
 
-# Create flag_default column with updated conditions
-def flag_default(row):
-    if row["total_income_monthly"] < row["amt_annuity"] and row["cnt_credit_prolong"] > 0:
-        return "Yes"
-    elif row["amt_annuity"] > 1.5* row["total_income_monthly"] and row["cnt_credit_prolong"] == 0:
-        # Assign probabilities based on the quarter
-        if row["quarter"] == "Q1":
-            return "Yes" if np.random.rand() < 0.9 else "No"
-        elif row["quarter"] == "Q2":
-            return "Yes" if np.random.rand() < 0.3 else "No"
-        elif row["quarter"] == "Q3":
-            return "Yes" if np.random.rand() < 0.6 else "No"
-        elif row["quarter"] == "Q4":
-            return "Yes" if np.random.rand() < 0.1 else "No"
-        else:
-            return "No"  # Default case if quarter is missing or invalid
-    else:
-        return "No"
-    
-users_df["flag_default"] = users_df.apply(flag_default, axis=1)
 
+# Function to add income, default and behavioral flags to the users table
+def add_user_flags(users_df, bureau_summary, rng=None):
+    rng = np.random if rng is None else rng
+    users_df = users_df.copy()
 
-users_df.drop(columns=['cnt_credit_prolong','quarter','amt_annuity'], inplace=True)
-# Define India's latitude and longitude bounds
-india_lat_min, india_lat_max = 8.0, 37.0
-india_lon_min, india_lon_max = 68.0, 97.0
+    # Generate random Yes/No values for Aadhar and pan_card
+    users_df["Aadhar"] = yes_no(0.5).sample(users_df, len(users_df), rng)
+    users_df["pan_card"] = yes_no(0.5).sample(users_df, len(users_df), rng)
 
-# Generate random latitude and longitude within India's boundaries
-users_df["latitude"] = np.random.uniform(india_lat_min, india_lat_max, len(users_df))
-users_df["longitude"] = np.random.uniform(india_lon_min, india_lon_max, len(users_df))
-users_df["car_flag"] = np.random.choice(["Yes", "No"], size=len(users_df), p=[0.4, 0.6])
-users_df["mobile_flag"] = np.random.choice(["Yes", "No"], size=len(users_df), p=[0.8, 0.2])
-users_df["email_flag"] = np.random.choice(["Yes", "No"], size=len(users_df), p=[0.6, 0.4])
-users_df["insurance_flag"] = np.random.choice(["Yes", "No"], size=len(users_df), p=[0.4, 0.6])
-users_df["kyc_flag"] = np.random.choice(["Yes", "No"], size=len(users_df), p=[0.4, 0.6])
+    # Assign total_income
+    users_df["total_income_monthly"] = income_model(users_df, rng)
 
 
+    # Per-customer annuity, prolongation count and home-loan indicator from the bureau step
+    users_df = users_df.merge(bureau_summary[["sk_id_curr", "amt_annuity", "cnt_credit_prolong", "has_home_loan"]],
+                              on="sk_id_curr", how="left")
 
-home_loan_ids = bureau_df.loc[bureau_df["credit_type"] == "Home Loan", "sk_id_curr"].unique()
+    # Ensure missing values in amt_annuity_monthly are handled
+    users_df["amt_annuity"] = users_df["amt_annuity"].fillna(0)
 
-# Step 2: Initialize own_house_flag column in users_df with "No"
-users_df["own_house_flag"] = "No"
+    # Assign quarters based on month number
+    users_df['quarter'] = np.array(['Q1', 'Q2', 'Q3', 'Q4'], dtype=object)[(users_df['loan_application_date'].dt.month.to_numpy() - 1) // 3]
 
-# Step 3: Find all matching records in users_df
-matching_users = users_df[users_df["sk_id_curr"].isin(home_loan_ids)]
 
-# Step 4:  select 90% of those users can change it to any other percentage later
-sample_size = int(len(matching_users) * 0.9)
-selected_users = np.random.choice(matching_users.index, size=sample_size, replace=False)
+    # Fill missing values with 0 and ensure integer type
+    users_df["cnt_credit_prolong"] = users_df["cnt_credit_prolong"].fillna(0).astype(int)
 
-# Step 5: Assign 'Yes' to own_house_flag for selected users
-users_df.loc[selected_users, "own_house_flag"] = "Yes"
+    users_df["flag_default"] = default_flag_table.sample(users_df, len(users_df), rng)
 
-import numpy as np
 
-# Define the five strings
-accompanied = ["Agent", "Family", "Unaccompanied", "Referal", "Unknown"]
+    has_home_loan = users_df["has_home_loan"].fillna(False).to_numpy(dtype=bool)
+    users_df.drop(columns=['cnt_credit_prolong','quarter','amt_annuity','has_home_loan'], inplace=True)
+    # Define India's latitude and longitude bounds
+    india_lat_min, india_lat_max = 8.0, 37.0
+    india_lon_min, india_lon_max = 68.0, 97.0
 
-# Create a function to assign the flag
-def assign_flag(flag_default):
-    if flag_default == "Yes":
-        if np.random.rand() < 0.4:  # 30% probability of selecting "String1"
-            return "Agent"
-    return np.random.choice(accompanied)  # Randomly choose from the five strings
+    # Generate random latitude and longitude within India's boundaries
+    users_df["latitude"] = rng.uniform(india_lat_min, india_lat_max, len(users_df))
+    users_df["longitude"] = rng.uniform(india_lon_min, india_lon_max, len(users_df))
+    for col, table in flag_tables.items():
+        users_df[col] = table.sample(users_df, len(users_df), rng)
 
-# Apply the function to create the new column
-users_df["accompanied_by"] = users_df["flag_default"].apply(assign_flag)
 
+    users_df["own_house_flag"] = own_house_table.sample({"has_home_loan": has_home_loan}, len(users_df), rng)
 
+    # Assign who accompanied the applicant, conditioned on flag_default
+    users_df["accompanied_by"] = accompanied_table.sample(users_df, len(users_df), rng)
 
+    return users_df
 
 
-# Save the updated CSV
-users_df.to_csv("users.csv", index=False)
+if __name__ == "__main__":
+    # Load the CSV files
+    users_df = credit_io.read_csv("users.csv")
+    bureau_summary = pd.read_csv("bureau_summary.csv")
 
+    users_df = add_user_flags(users_df, bureau_summary)
 
+    # Save the updated CSV
+    registry = TableRegistry()
+    credit_io.write_csv(users_df, "users.csv", registry, "Step 3 Flags.py")
+    registry.save()
@@ -1,10 +1,25 @@
 
 
 
+import os
 import pandas as pd
 import numpy as np
-bereau_df = pd.read_csv('bureau.csv')
+import credit_io
+from table_registry import TableRegistry
 
+# "snapshot": one row per card with a random MONTHS_BALANCE
+# "panel": a contiguous monthly series per card (up to PANEL_MONTHS months), written in chunks
+CREDIT_CARD_MODE = "snapshot"
+PANEL_MONTHS = 60
+PANEL_CHUNK_ROWS = 2_000_000  # panel rows held in memory at a time
+
+# Panel behaviour: share of months without a payment, payment rate otherwise, minimum instalment rate
+# (a paying month also pays an extra instalment of up to the minimum instalment on top)
+MISSED_PAYMENT_PROB = 0.1
+PAYMENT_RATE_RANGE = (0.05, 0.9)
+MIN_INSTALMENT_RATE = 0.05
+MONTHLY_INTEREST = 0.02
+DPD_TOLERANCE = 100  # missed instalments below this amount do not count towards SK_DPD_DEF
 
 
 def generate_credit_card_dataset(input_df):
@@ -13,15 +28,14 @@ def generate_credit_card_dataset(input_df):
     
     output_df = pd.DataFrame()
     
-    # Generating synthetic values for each column
+    # Generating synthetic values for each column (one row per credit card loan)
     output_df['SK_ID_PREV'] = np.random.randint(1000000, 9999999, num_records)
-    output_df['sk_id_curr'] = input_df['sk_id_curr']
+    output_df['sk_id_curr'] = input_df['sk_id_curr'].to_numpy()
     output_df['MONTHS_BALANCE'] = np.random.randint(-60, 0, num_records)
     
-    # Assign AMT_CREDIT_LIMIT_ACTUAL from amt_credit_sum_limit for corresponding SK_ID_CURR
-    output_df = output_df.merge(input_df[['sk_id_curr', 'amt_credit_sum_limit']], on='sk_id_curr', how='left')
-    num_records = len(output_df) 
-    output_df.rename(columns={'amt_credit_sum_limit': 'AMT_CREDIT_LIMIT_ACTUAL'}, inplace=True)
+    # AMT_CREDIT_LIMIT_ACTUAL is the card's own amt_credit_sum_limit (taken row by row, a merge
+    # on sk_id_curr would multiply rows for customers with several cards)
+    output_df['AMT_CREDIT_LIMIT_ACTUAL'] = input_df['amt_credit_sum_limit'].to_numpy()
     
     # Interlinked amount columns
     credit_limit = output_df['AMT_CREDIT_LIMIT_ACTUAL'].fillna(0).astype(float)
@@ -60,12 +74,156 @@ def generate_credit_card_dataset(input_df):
     
     return output_df
 
+# --- Monthly panel ---
+def _grouped_cumsum(values, card, month):
+    # Cumulative sum that restarts at every card. The rows are laid out in a cards x months grid and
+    # summed along the months, so no card's sum is offset by the totals of the cards before it
+    grid = np.zeros((card.max() + 1, month.max() + 1) if len(card) else (0, 0), dtype=values.dtype)
+    grid[card, month] = values
+    return np.cumsum(grid, axis=1)[card, month]
+
+
+def panel_balance_residuals(panel_df):
+    """
+    AMT_BALANCE - (previous AMT_BALANCE - AMT_PAYMENT_TOTAL_CURRENT + AMT_DRAWINGS_CURRENT) for
+    every row after a card's first month; only rounding (a few cents) when the balances reconcile.
+    """
+    balance = panel_df['AMT_BALANCE'].to_numpy()
+    months = panel_df['MONTHS_BALANCE'].to_numpy()
+    follows = np.r_[False, np.diff(months) == 1]  # a card's rows are consecutive months
+    expected = (np.roll(balance, 1) - panel_df['AMT_PAYMENT_TOTAL_CURRENT'].to_numpy()
+                + panel_df['AMT_DRAWINGS_CURRENT'].to_numpy())
+    return (balance - expected)[follows]
+
+
+def generate_credit_card_panel(input_df, rng=None):
+    """
+    One row per card and month, MONTHS_BALANCE -n..-1 with n drawn from 1..PANEL_MONTHS.
+    Each month the customer pays a share a_t of last month's balance (AMT_PAYMENT_CURRENT) plus
+    an extra instalment e_t of below MIN_INSTALMENT_RATE of it (AMT_PAYMENT_TOTAL_CURRENT covers
+    both; nothing is paid in MISSED_PAYMENT_PROB of the months) and draws at most a_t * limit, so
+        B_t = (1 - a_t - e_t) * B_{t-1} + d_t
+    never exceeds the limit. The recursion is solved for all months at once with
+    per-card cumulative sums:
+        B_t = exp(c_t) * ((1 - r_0) * B_open + sum_{s<=t} d_s * exp(-c_s)),  c_t = sum_{0<u<=t} log(1 - r_u)
+    with r_t = a_t + e_t.
+    SK_DPD counts 30 days per consecutive missed minimum instalment.
+    """
+    rng = np.random if rng is None else rng
+    num_cards = len(input_df)
+    limit = np.nan_to_num(input_df['amt_credit_sum_limit'].to_numpy(dtype=float))
+    num_months = rng.randint(1, PANEL_MONTHS + 1, size=num_cards)
+
+    card = np.repeat(np.arange(num_cards), num_months)
+    n = len(card)
+    card_start = np.cumsum(num_months) - num_months
+    first_row = np.repeat(card_start, num_months)
+    month = np.arange(n) - first_row  # 0 .. num_months - 1
+    L = limit[card]
+
+    # Payment share of the previous balance; a missed month pays nothing
+    missed = rng.rand(n) < MISSED_PAYMENT_PROB
+    pay_rate = np.where(missed, 0.0, rng.uniform(*PAYMENT_RATE_RANGE, size=n))
+    extra_rate = np.where(missed, 0.0, rng.uniform(0, MIN_INSTALMENT_RATE, size=n))
+    total_rate = pay_rate + extra_rate
+
+    # Drawings split over ATM / other / POS, bounded by the headroom freed by the payment
+    active = rng.rand(n) < 0.4
+    shares = rng.rand(n, 3) * (np.array([2, 1, 3]) / 6) * active[:, None]  # each row sums to at most 1
+    drawings = shares * (pay_rate * L)[:, None]
+    drawn = drawings.sum(axis=1)
+
+    # Balance recursion via log-cumsum per card; c_t is 0 in each card's first month, which keeps exp(-c_t) bounded
+    log_keep = _grouped_cumsum(np.where(month == 0, 0.0, np.log1p(-total_rate)), card, month)
+    opening = rng.uniform(0, 0.9 * limit)[card]
+    balance = np.exp(log_keep) * ((1 - total_rate[first_row]) * opening + _grouped_cumsum(drawn * np.exp(-log_keep), card, month))
+    previous = np.where(month == 0, opening, np.roll(balance, 1))
+    payment = pay_rate * previous
+    payment_total = total_rate * previous
+    min_instalment = MIN_INSTALMENT_RATE * previous
+
+    # Consecutive missed minimum instalments, restarting at every card
+    missed_due = missed & (min_instalment > 0)
+    missed_total = np.cumsum(missed_due)
+    reset = (~missed_due) | (month == 0)
+    run_base = np.maximum.accumulate(np.where(reset, missed_total - missed_due, 0))
+    dpd = (missed_total - run_base) * 30
+
+    counts = np.where(drawings > 0, rng.randint(1, [10, 5, 10], size=(n, 3)), 0)
+    paid = ~missed_due & (payment > 0)
+
+    output_df = pd.DataFrame({
+        'SK_ID_PREV': rng.randint(1000000, 9999999, num_cards)[card],
+        'sk_id_curr': input_df['sk_id_curr'].to_numpy()[card],
+        'MONTHS_BALANCE': month - num_months[card],
+        'AMT_CREDIT_LIMIT_ACTUAL': L,
+        'AMT_BALANCE': balance.round(2),
+        'AMT_DRAWINGS_ATM_CURRENT': drawings[:, 0].round(2),
+        'AMT_DRAWINGS_OTHER_CURRENT': drawings[:, 1].round(2),
+        'AMT_DRAWINGS_POS_CURRENT': drawings[:, 2].round(2),
+        'AMT_DRAWINGS_CURRENT': drawn.round(2),
+        'AMT_INST_MIN_REGULARITY': min_instalment.round(2),
+        'AMT_PAYMENT_CURRENT': payment.round(2),
+        'AMT_PAYMENT_TOTAL_CURRENT': payment_total.round(2),
+        'AMT_RECEIVABLE_PRINCIPAL': balance.round(2),
+        'AMT_RECIVABLE': (balance * (1 + MONTHLY_INTEREST)).round(2),
+        'AMT_TOTAL_RECEIVABLE': (balance * (1 + MONTHLY_INTEREST) + np.where(missed_due, min_instalment, 0)).round(2),
+        'CNT_DRAWINGS_ATM_CURRENT': counts[:, 0],
+        'CNT_DRAWINGS_OTHER_CURRENT': counts[:, 1],
+        'CNT_DRAWINGS_POS_CURRENT': counts[:, 2],
+        'CNT_DRAWINGS_CURRENT': counts.sum(axis=1),
+        'CNT_INSTALMENT_MATURE_CUM': _grouped_cumsum(paid.astype(np.int64), card, month),
+        'NAME_CONTRACT_STATUS': np.where(month == 0, 'Signed', 'Active').astype(object),
+        'SK_DPD': dpd,
+        'SK_DPD_DEF': np.where(min_instalment >= DPD_TOLERANCE, dpd, 0),
+    })
+    assert np.abs(panel_balance_residuals(output_df)).max(initial=0.0) <= 0.05, "panel balances do not reconcile"
+    return output_df
+
+
+def iter_credit_card_panel(input_df, chunk_rows=PANEL_CHUNK_ROWS, rng=None):
+    # Cards are independent, so the panel is produced for about chunk_rows / PANEL_MONTHS cards at a time
+    cards_per_chunk = max(1, chunk_rows // PANEL_MONTHS)
+    for start in range(0, len(input_df), cards_per_chunk):
+        yield generate_credit_card_panel(input_df.iloc[start:start + cards_per_chunk], rng)
+
+
+def write_credit_card_panel(input_df, path, chunk_rows=PANEL_CHUNK_ROWS, rng=None, registry=None, source=None):
+    """
+    Streams the panel to a CSV chunk by chunk; returns the number of rows written.
+    registry: optional TableRegistry that collects the table statistics chunk by chunk.
+    """
+    rows = 0
+    if registry is not None:
+        registry.reset(os.path.basename(path))
+    for i, chunk in enumerate(iter_credit_card_panel(input_df, chunk_rows, rng)):
+        chunk.to_csv(path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+        if registry is not None:
+            registry.observe(os.path.basename(path), chunk, source)
+        rows += len(chunk)
+    return rows
+
+
+# Function to build the credit card table from the credit card loans in the bureau table
+def credit_card_loans(bereau_df):
+    # Creating a sample input DataFrame with SK_ID_CURR
+    return bereau_df.loc[bereau_df['credit_type'] == "Credit Card Loan", ['sk_id_curr', 'amt_credit_sum_limit']]
+
+
+def build_credit_card_table(bereau_df):
+    return generate_credit_card_dataset(credit_card_loans(bereau_df))
+
 # Example usage
 if __name__ == "__main__":
-    # Creating a sample input DataFrame with SK_ID_CURR
-    input_data = bereau_df.loc[bereau_df['credit_type'] == "Credit Card Loan", ['sk_id_curr', 'amt_credit_sum_limit']]
-    generated_df = generate_credit_card_dataset(input_data)
-    generated_df.to_csv("creditcard.csv", index=False)
+    bereau_df = pd.read_csv('bureau.csv')
+    registry = TableRegistry()
+    if CREDIT_CARD_MODE == "panel":
+        write_credit_card_panel(credit_card_loans(bereau_df), "creditcard.csv", registry=registry,
+                                source="Step 4 credit_card_payments.py")
+    else:
+        generated_df = build_credit_card_table(bereau_df)
+        credit_io.write_csv(generated_df, "creditcard.csv", registry, "Step 4 credit_card_payments.py")
+    registry.save()
 
 
 
@@ -1,21 +1,27 @@
-
-
-
 import pandas as pd
-import glob
-
+from table_registry import REGISTRY_PATH, load_registry
 
-csv_files = glob.glob("*.csv")  
 
+# Function to list every column of the registered tables with its statistics
+# (registry: {file name: {"source", "rows", "columns": {...}}} as saved by table_registry)
+def build_data_dictionary(registry):
+    column_data = []
 
-column_data = []
+    for file, table in registry.items():
+        for col, stats in table["columns"].items():
+            column_data.append([col, file, table["source"], stats["dtype"], stats["rows"], stats["null_rate"],
+                                stats["distinct_estimate"], stats["min"], stats["max"]])
 
-for file in csv_files:
-    df = pd.read_csv(file, nrows=1)  
-    for col in df.columns:
-        column_data.append([col, file])  
+    columns_df = pd.DataFrame(column_data, columns=["Column Name", "File Name", "Source Script", "Data Type", "Row Count",
+                                                    "Null Rate", "Distinct Count (est.)", "Min", "Max"])
+    # Min/Max mix numbers, strings and dates across columns; as text they fit one column type (e.g. for Parquet)
+    columns_df[["Min", "Max"]] = columns_df[["Min", "Max"]].astype("string")
+    return columns_df
 
 
-columns_df = pd.DataFrame(column_data, columns=[ "File Name", "Column Name"])
-columns_df.to_csv("Data_Dictionary.csv", index=False)
+if __name__ == "__main__":
+    # Statistics were recorded by the generators while they wrote their files
+    registry = load_registry(REGISTRY_PATH)
 
+    columns_df = build_data_dictionary(registry)
+    columns_df.to_csv("Data_Dictionary.csv", index=False)
@@ -3,6 +3,7 @@ import numpy as np
 from datetime import datetime, timedelta
 import random
 import os
+from table_registry import register_tables
 
 # --- Configuration ---
 NUM_SUBSCRIBERS = 5000
@@ -241,6 +242,8 @@ os.makedirs(output_dir, exist_ok=True)
 
 df_fact_telecom_events.to_csv(os.path.join(output_dir, 'fact_telecom_events.csv'), index=False)
 df_dim_network_entities.to_csv(os.path.join(output_dir, 'dim_network_entities.csv'), index=False)
+register_tables({os.path.join(output_dir, 'fact_telecom_events.csv'): df_fact_telecom_events,
+                 os.path.join(output_dir, 'dim_network_entities.csv'): df_dim_network_entities}, "Telecom_Industry.py")
 
 print("\nCSV files generated successfully in the 'telecom_analytics_data' directory.")
 print("You can now import these CSVs into your analytics tool.")
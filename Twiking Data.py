@@ -1,206 +1,81 @@
 import pandas as pd
 import numpy as np
-
-
-
-# Step 1: Load CSV into DataFrame
-df = pd.read_csv('main.csv')  # Replace with your actual file path
-print("Previous number of records "+str(len(df)))
-df['sale_date'] = pd.to_datetime(df['sale_date'])
-
-# Filter Q4 2023
-q4_2023_df = df[
-    (df['sale_date'] >= '2023-10-01') &
-    (df['sale_date'] <= '2023-12-31')
-]
-
-# Step 1: Get 10% of unique account_ids from Q4 2023
-unique_accounts = q4_2023_df['Account Group ID'].unique()
-selected_account_ids = np.random.choice(
-    unique_accounts,
-    size=int(len(unique_accounts) * 0.10),
-    replace=False
-)
-
-# Step 2: For each selected account_id, randomly delete 50% of its Q4 2023 records
-rows_to_delete = []
-
-for acct in selected_account_ids:
-    acct_rows = q4_2023_df[q4_2023_df['Account Group ID'] == acct]
-    delete_count = int(len(acct_rows) * 0.50)
-    rows_to_delete.extend(acct_rows.sample(delete_count, random_state=42).index)
-
-# Step 3: Drop selected rows from original dataframe
-df = df.drop(index=rows_to_delete)
-print("Updated number of records "+str(len(df)))
-
-################################################################################################################
-
-
-#Product IN ('type 1 med', 'type 4 med', 'type 6 med')
-unique_accounts = df['Account Group ID'].unique()
-
-# Step 2: Randomly select 10% of account_ids
-selected_account_ids = np.random.choice(
-    unique_accounts,
-    size=int(len(unique_accounts) * 0.10),
-    replace=False
-)
-
-# Step 3: Filter rows where Product is in the target list and account_id is in selected list
-condition = (
-    df['Account Group ID'].isin(selected_account_ids) &
-    df['Product'].isin(['type 1 med', 'type 4 med', 'type 6 med'])
-)
-
-# Step 4: Drop those rows
-df = df[~condition]
-print("Updated number of records after product level delete"+str(len(df)))
-
-
-################################################################################################################
-
-#Vial delete
-unique_accounts = df['Account Group ID'].unique()
-
-# Step 2: Randomly select 10% of account_ids
-selected_account_ids = np.random.choice(
-    unique_accounts,
-    size=int(len(unique_accounts) * 0.10),
-    replace=False
-)
-
-# Step 3: Filter rows where Product is in the target list and account_id is in selected list
-condition = (
-    df['Account Group ID'].isin(selected_account_ids) &
-    df['Form'].isin(['vial'])
-)
-
-# Step 4: Drop those rows
-df = df[~condition]
-print("Updated number of records after product level delete"+str(len(df)))
-
-################################################################################################################
-# Delete all records of q3 and q4 for 10 percent records who have tier 1 record
-
-# Filter for Q3 and Q4 2023 sales data
-q3_q4_2023_df = df[
-    (df['sale_date'] >= '2024-05-01') &
-    (df['sale_date'] <= '2024-12-31')
-]
-
-# Filter to only Tier 2 accounts
-tier2_accounts_df = q3_q4_2023_df[q3_q4_2023_df['GPO Tier'] == 'Tier 2']
-
-# Get 10% of unique Tier 2 account_ids
-unique_accounts = tier2_accounts_df['Account Group ID'].unique()
-selected_account_ids = np.random.choice(
-    unique_accounts,
-    size=int(len(unique_accounts) * 0.10),
-    replace=False
-)
-
-# Assuming q4_2023_df is defined earlier (if not, filter it here)
-q4_2023_df = df[
-    (df['sale_date'] >= '2024-05-01') &
-    (df['sale_date'] <= '2024-12-31')
-]
-
-# Step 2: For each selected account_id, randomly delete 100% of its Q4 2023 records
-rows_to_delete = []
-
-for acct in selected_account_ids:
-    acct_rows = q4_2023_df[q4_2023_df['Account Group ID'] == acct]
-    delete_count = int(len(acct_rows) * 1)
-    rows_to_delete.extend(acct_rows.sample(delete_count, random_state=42).index)
-
-# Step 3: Drop selected rows from original dataframe
-df = df.drop(index=rows_to_delete)
-print("Updated number of records after product level delete"+str(len(df)))
-
-################################################################################################################
-# Filter for Q3 and Q4 2023 sales data
-q3_q4_2023_df = df[
-    (df['sale_date'] >= '2023-01-01') &
-    (df['sale_date'] <= '2023-12-31')
+from sales_store import read_sales, write_partitioned
+from deletion_scenarios import DeletionScenario, apply_scenarios
+from table_registry import register_tables
+
+# main.csv, or the directory written by main.py with OUTPUT_MODE = "star" / "partitioned"
+INPUT_PATH = 'main.csv'
+# A .csv file, or a directory to write a year/quarter/Region partitioned Parquet dataset
+OUTPUT_PATH = 'main_alt.csv'
+
+TARGET_PRODUCTS = ['type 1 med', 'type 4 med', 'type 6 med']
+TARGET_LOCATIONS = ['LOC_0347', 'LOC_0370', 'LOC_0563', 'LOC_0347', 'LOC_1132', 'LOC_1992', 'LOC_1912', 'LOC_1861']
+
+
+def between(start, end):
+    return lambda df: (df['sale_date'] >= start) & (df['sale_date'] <= end)
+
+
+def all_of(*predicates):
+    return lambda df: np.logical_and.reduce([predicate(df) for predicate in predicates])
+
+
+def column_in(col, values):
+    return lambda df: df[col].isin(values)
+
+
+def column_is(col, value):
+    return lambda df: df[col] == value
+
+
+# Applied in order; each scenario only sees the rows kept by the ones before it
+SCENARIOS = [
+    # 10% of the accounts with Q4 2023 sales lose 50% of their Q4 2023 records
+    DeletionScenario("Q4 2023 account records", rows=between('2023-10-01', '2023-12-31'),
+                     key='Account Group ID', group_fraction=0.10, row_fraction=0.50),
+    # Product IN ('type 1 med', 'type 4 med', 'type 6 med') for 10% of the accounts
+    DeletionScenario("Product level delete", rows=column_in('Product', TARGET_PRODUCTS),
+                     groups=lambda df: np.ones(len(df), dtype=bool), key='Account Group ID', group_fraction=0.10),
+    # Vial delete for 10% of the accounts
+    DeletionScenario("Vial delete", rows=column_is('Form', 'vial'),
+                     groups=lambda df: np.ones(len(df), dtype=bool), key='Account Group ID', group_fraction=0.10),
+    # All May-Dec 2024 records of 10% of the Tier 2 accounts active in that period
+    DeletionScenario("Tier 2 May-Dec 2024", rows=between('2024-05-01', '2024-12-31'),
+                     groups=all_of(between('2024-05-01', '2024-12-31'), column_is('GPO Tier', 'Tier 2')),
+                     key='Account Group ID', group_fraction=0.10),
+    # All May-Dec 2024 records of every South Tier 2 account with 2023 sales
+    DeletionScenario("South Tier 2 May-Dec 2024", rows=between('2024-05-01', '2024-12-31'),
+                     groups=all_of(between('2023-01-01', '2023-12-31'), column_is('GPO Tier', 'Tier 2'), column_is('Region', 'South')),
+                     key='Account Group ID', group_fraction=1.0),
+    # 80% of the Q1 2023 South records
+    DeletionScenario("South Q1 2023", rows=all_of(between('2023-01-01', '2023-03-31'), column_is('Region', 'South')),
+                     row_fraction=0.80),
+    # 99% of the Q1 2023 records of the target products at the target locations
+    DeletionScenario("Q1 2023 products at locations", rows=all_of(between('2023-01-01', '2023-03-31'),
+                                                                  column_in('Product', TARGET_PRODUCTS),
+                                                                  column_in('Location_ID', TARGET_LOCATIONS)),
+                     row_fraction=0.99),
+    # 80% of the Q4 2024 Northeast records of the target products
+    DeletionScenario("Northeast Q4 2024 products", rows=all_of(between('2024-10-01', '2024-12-31'), column_is('Region', 'Northeast'),
+                                                               column_in('Product', TARGET_PRODUCTS)),
+                     row_fraction=0.80),
 ]
 
-# Filter to only Tier 2 accounts
-tier2_accounts_df = q3_q4_2023_df[(q3_q4_2023_df['GPO Tier'] == 'Tier 2') &
-    (q3_q4_2023_df['Region'] == 'South')]
-
-# Get 10% of unique Tier 2 account_ids
-unique_accounts = tier2_accounts_df['Account Group ID'].unique()
-selected_account_ids = np.random.choice(
-    unique_accounts,
-    size=int(len(unique_accounts) * 1),
-    replace=False
-)
-
-# Assuming q4_2023_df is defined earlier (if not, filter it here)
-q4_2023_df = df[
-    (df['sale_date'] >= '2024-05-01') &
-    (df['sale_date'] <= '2024-12-31')
-]
-
-# Step 2: For each selected account_id, randomly delete 100% of its Q4 2023 records
-rows_to_delete = []
-
-for acct in selected_account_ids:
-    acct_rows = q4_2023_df[q4_2023_df['Account Group ID'] == acct]
-    delete_count = int(len(acct_rows) * 1)
-    rows_to_delete.extend(acct_rows.sample(delete_count, random_state=42).index)
-
-# Step 3: Drop selected rows from original dataframe
-df = df.drop(index=rows_to_delete)
-print("Updated number of records after product level delete"+str(len(df)))
-
-################################################################################################################
 
-target_rows = df[
-    (df['sale_date'] >= '2023-01-01') &
-    (df['sale_date'] <= '2023-03-31') &
-    (df['Region'] == 'South')
-]
-
-# Step 2: Sample 80% of those rows to delete
-delete_count = int(len(target_rows) * 0.80)
-rows_to_delete = target_rows.sample(n=delete_count, random_state=42).index
-
-# Step 3: Drop the sampled rows from original df
-df = df.drop(index=rows_to_delete)
-print("Updated number of records after product level delete"+str(len(df)))
-################################################################################################################
-target_rows = df[
-    (df['sale_date'] >= '2023-01-01') &
-    (df['sale_date'] <= '2023-03-31') &
-    (df['Product'].isin(['type 1 med', 'type 4 med', 'type 6 med']))&
-    (df['Location_ID'].isin(['LOC_0347', 'LOC_0370', 'LOC_0563','LOC_0347', 'LOC_1132', 'LOC_1992','LOC_1912','LOC_1861']))
-    
-     
-]
-
-# Step 2: Sample 80% of those rows to delete
-delete_count = int(len(target_rows) * 0.99)
-rows_to_delete = target_rows.sample(n=delete_count, random_state=42).index
-
-# Step 3: Drop the sampled rows from original df
-df = df.drop(index=rows_to_delete)
-print("Updated number of records after product level delete"+str(len(df)))
-################################################################################################################
-target_rows = df[
-    (df['sale_date'] >= '2024-10-01') &
-    (df['sale_date'] <= '2024-12-31') &
-    (df['Region'] == 'Northeast')&
-    (df['Product'].isin(['type 1 med', 'type 4 med', 'type 6 med']))
-]
+if __name__ == "__main__":
+    # Step 1: Load CSV into DataFrame
+    df = read_sales(INPUT_PATH)  # Replace with your actual file path
+    print("Previous number of records "+str(len(df)))
+    df['sale_date'] = pd.to_datetime(df['sale_date'])
 
-# Step 2: Sample 80% of those rows to delete
-delete_count = int(len(target_rows) * 0.80)
-rows_to_delete = target_rows.sample(n=delete_count, random_state=42).index
+    # Step 2: Work out every scenario's deletions and drop them once
+    df, report = apply_scenarios(df, SCENARIOS)
+    print(report.to_string(index=False))
+    print("Updated number of records "+str(len(df)))
 
-# Step 3: Drop the sampled rows from original df
-df = df.drop(index=rows_to_delete)
-print("Updated number of records after product level delete"+str(len(df)))
-################################################################################################################
-df.to_csv("main_alt.csv", index=False)
\ No newline at end of file
+    if OUTPUT_PATH.endswith('.csv'):
+        df.to_csv(OUTPUT_PATH, index=False)
+    else:
+        write_partitioned(df, OUTPUT_PATH)
+    register_tables({OUTPUT_PATH: df}, "Twiking Data.py")
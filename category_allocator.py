@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+
+# --- Helper Functions ---
+def _code_dtype(num_categories):
+    return np.int8 if num_categories < 2 ** 7 else np.int16 if num_categories < 2 ** 15 else np.int32
+
+
+def allocate_counts(proportions, n):
+    """Splits n into per-category counts that follow `proportions` and sum exactly to n (largest remainder)."""
+    proportions = np.asarray(proportions, dtype=float)
+    exact = proportions / proportions.sum() * n
+    counts = np.floor(exact).astype(np.int64)
+    shortfall = n - counts.sum()
+    if shortfall:
+        # Hand the leftover rows to the categories with the largest fractional parts
+        counts[np.argsort(counts - exact, kind="stable")[:shortfall]] += 1
+    return counts
+
+
+def allocate_codes(proportions, n, rng=None):
+    """Returns a shuffled integer-code array of length n with exact per-category counts."""
+    rng = np.random if rng is None else rng
+    counts = allocate_counts(proportions, n)
+    codes = np.repeat(np.arange(len(counts), dtype=_code_dtype(len(counts))), counts)
+    rng.shuffle(codes)
+    return codes
+
+
+def allocate_categorical(categories, proportions, n, rng=None):
+    """Same as allocate_codes, wrapped as a pandas Categorical over `categories`."""
+    return pd.Categorical.from_codes(allocate_codes(proportions, n, rng), categories=categories)
+
+
+def dependent_categorical(codes, categories, mapping):
+    """
+    Derives a dependent attribute (e.g. Form from Product) from parent codes
+    through a code-level lookup table instead of a per-row string map.
+    """
+    targets = list(dict.fromkeys(mapping[c] for c in categories))
+    table = np.array([targets.index(mapping[c]) for c in categories], dtype=_code_dtype(len(targets)))
+    return pd.Categorical.from_codes(table[np.asarray(codes)], categories=targets)
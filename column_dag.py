@@ -0,0 +1,94 @@
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+
+class ColumnGraph:
+    """
+    Declarative column-dependency graph. Each column names the columns it is
+    computed from; run() schedules them in dependency order, computes
+    independent columns concurrently and drops intermediates as soon as their
+    last consumer has finished.
+    """
+
+    def __init__(self):
+        self.columns = {}  # name -> (func, inputs), in declaration order
+
+    def add(self, name, func, inputs=()):
+        if name in self.columns:
+            raise ValueError(f"Column '{name}' is already defined")
+        self.columns[name] = (func, tuple(inputs))
+        return self
+
+    def _required(self, targets, provided):
+        # Columns that have to be computed to produce `targets` given the already available ones
+        required, stack = set(), list(targets)
+        while stack:
+            name = stack.pop()
+            if name in required or name in provided:
+                continue
+            if name not in self.columns:
+                raise KeyError(f"Column '{name}' is not defined and was not provided")
+            required.add(name)
+            stack.extend(self.columns[name][1])
+        return required
+
+    def topological_order(self, targets=None, provided=()):
+        targets = list(self.columns) if targets is None else list(targets)
+        required = self._required(targets, set(provided))
+        order, done = [], set(provided)
+        pending = [name for name in self.columns if name in required]
+        while pending:
+            ready = [name for name in pending if all(i in done for i in self.columns[name][1])]
+            if not ready:
+                raise ValueError(f"Dependency cycle between columns: {pending}")
+            order.extend(ready)
+            done.update(ready)
+            pending = [name for name in pending if name not in done]
+        return order
+
+    def run(self, targets=None, values=None, max_workers=None):
+        """
+        Computes `targets` (default: every column, in declaration order) and returns {name: values}.
+        values: already computed columns (e.g. from an existing frame); only what is missing is
+            regenerated, so a single column can be rebuilt without recomputing the rest.
+        max_workers=1 runs serially, which keeps draws from a shared RNG reproducible.
+        """
+        targets = list(self.columns) if targets is None else list(targets)
+        values = dict(values or {})
+        order = self.topological_order(targets, provided=values)
+
+        # Remaining consumers per column, so intermediates can be released early
+        consumers = {name: 0 for name in values}
+        for name in order:
+            consumers.setdefault(name, 0)
+            for dep in self.columns[name][1]:
+                consumers[dep] = consumers.get(dep, 0) + 1
+
+        def release(deps):
+            for dep in deps:
+                consumers[dep] -= 1
+                if consumers[dep] == 0 and dep not in targets:
+                    values.pop(dep, None)
+
+        def compute(name):
+            func, inputs = self.columns[name]
+            return func(*[values[i] for i in inputs])
+
+        pending = list(order)
+        if max_workers == 1:
+            for name in pending:
+                values[name] = compute(name)
+                release(self.columns[name][1])
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                running = {}
+                while pending or running:
+                    for name in [n for n in pending if all(i in values for i in self.columns[n][1])]:
+                        running[pool.submit(compute, name)] = name
+                        pending.remove(name)
+                    finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        name = running.pop(future)
+                        values[name] = future.result()
+                        release(self.columns[name][1])
+
+        return {name: values[name] for name in targets}
@@ -0,0 +1,56 @@
+import numpy as np
+
+# Conditional probability tables (CPT) for categorical labels. Each table row
+# is a condition with the outcome probabilities that apply when it holds; the
+# first matching row wins. Labels for every record are drawn with one uniform
+# number per record and a vectorized bucket lookup in the row's cumulative
+# probabilities.
+
+
+class ConditionalTable:
+    def __init__(self, outcomes, rows, default=None):
+        """
+        outcomes: the labels, e.g. ["Yes", "No"].
+        rows: [(condition, probs), ...]. condition is a function of the columns
+            returning a boolean mask (None means "always"); probs is a list aligned
+            with outcomes or a dict {outcome: p} (missing outcomes get 0).
+        default: probs for records no row matches (default: always the last outcome).
+        """
+        self.outcomes = list(outcomes)
+        self.conditions = [condition for condition, _ in rows]
+        default = [0.0] * (len(self.outcomes) - 1) + [1.0] if default is None else default
+        probs = np.array([self._as_probs(p) for _, p in rows] + [self._as_probs(default)])
+        if np.any(probs < 0) or not np.allclose(probs.sum(axis=1), 1.0):
+            raise ValueError("Every row of a ConditionalTable must hold probabilities that sum to 1")
+        self.cumulative = np.cumsum(probs, axis=1)
+        self.cumulative[:, -1] = 1.0  # guard against rounding, so every draw lands in a bucket
+
+    def _as_probs(self, probs):
+        if isinstance(probs, dict):
+            unknown = set(probs) - set(self.outcomes)
+            if unknown:
+                raise ValueError(f"Unknown outcomes in ConditionalTable row: {sorted(unknown)}")
+            return [probs.get(outcome, 0.0) for outcome in self.outcomes]
+        return list(probs)
+
+    def row_index(self, cols, size):
+        """Index of the table row each record falls into (the last index is the default row)."""
+        masks = [np.ones(size, dtype=bool) if condition is None else np.broadcast_to(np.asarray(condition(cols), dtype=bool), (size,))
+                 for condition in self.conditions]
+        return np.select(masks, np.arange(len(masks)), default=len(masks))
+
+    def sample_codes(self, cols, size, rng=None):
+        """Outcome index per record, from one uniform draw per record."""
+        rng = np.random if rng is None else rng
+        cumulative = self.cumulative[self.row_index(cols, size)]
+        u = rng.random_sample(size)
+        return (u[:, None] >= cumulative).sum(axis=1)
+
+    def sample(self, cols, size, rng=None):
+        """Label per record (object array)."""
+        return np.array(self.outcomes, dtype=object)[self.sample_codes(cols, size, rng)]
+
+
+def yes_no(p_yes):
+    """Unconditional Yes/No table with P(Yes) = p_yes."""
+    return ConditionalTable(["Yes", "No"], [(None, [p_yes, 1 - p_yes])])
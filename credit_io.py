@@ -0,0 +1,34 @@
+import os
+import pandas as pd
+from date_sampler import format_dates
+
+# Text layout of the date columns in the credit-risk CSV files. Inside the
+# pipeline these columns stay datetime64[ns]; they are only formatted on write.
+DATE_FORMATS = {
+    "date_of_birth": "%m-%d-%Y",
+    "loan_application_date": "%m/%d/%Y",
+}
+
+
+def read_csv(path, **kwargs):
+    """Reads a credit-risk CSV and parses its known date columns with their exact format."""
+    df = pd.read_csv(path, **kwargs)
+    for col, fmt in DATE_FORMATS.items():
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], format=fmt)
+    return df
+
+
+def write_csv(df, path, registry=None, source=None):
+    """
+    Final writer: formats datetime columns to their CSV layout and saves the frame.
+    registry: a table_registry.TableRegistry that records the table's statistics on the way out.
+    """
+    if registry is not None:
+        registry.reset(os.path.basename(path))
+        registry.observe(os.path.basename(path), df, source)
+    out = df.copy(deep=False)
+    for col, fmt in DATE_FORMATS.items():
+        if col in out.columns and pd.api.types.is_datetime64_any_dtype(out[col]):
+            out[col] = format_dates(out[col], fmt)
+    out.to_csv(path, index=False)
@@ -0,0 +1,234 @@
+import importlib.util
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+import credit_io
+from table_registry import REGISTRY_PATH, TableRegistry
+
+# Runs the credit-risk use case (Step 1 - Step 5) in one process. Tables are
+# handed from stage to stage as DataFrames; CSV files are only written at the
+# end, and each stage can optionally checkpoint its tables as Parquet so a
+# failed run can be resumed from the last completed stage.
+
+# Set CHECKPOINT_DIR (e.g. "pipeline_checkpoints") to save each stage; RESUME reuses completed stages
+CHECKPOINT_DIR = None
+RESUME = False
+
+# Users are generated in NUM_SHARDS shards across a process pool; SEED makes the run reproducible
+# Ages are measured from REFERENCE_DATE, so reruns on a later day give the same users
+NUM_SHARDS = 1
+SEED = None
+REFERENCE_DATE = "2025-01-01"
+
+# "snapshot" or "history" (full monthly bureau_balance, see BUREAU_BALANCE_MODE in Step 2)
+BALANCE_MODE = "snapshot"
+# "snapshot" or "panel" (monthly credit-card series, see CREDIT_CARD_MODE in Step 4)
+CREDIT_CARD_MODE = "snapshot"
+
+PIPELINE_DIR = os.path.dirname(os.path.abspath(__file__))
+STEP_FILES = {
+    "users": "Step 1 User.py",
+    "bureau": "Step 2 beaurue.py",
+    "flags": "Step 3 Flags.py",
+    "credit_card": "Step 4 credit_card_payments.py",
+    "data_dictionary": "Step 5 Data Dictionary.py",
+}
+
+# Final CSV name of every table kept in the pipeline state
+OUTPUT_FILES = {
+    "users": "users.csv",
+    "bureau": "bureau.csv",
+    "bureau_balance": "bureau_balance.csv",
+    "bureau_summary": "bureau_summary.csv",
+    "creditcard": "creditcard.csv",
+    "data_dictionary": "Data_Dictionary.csv",
+}
+
+
+# Function to import a step script (the file names contain spaces, so plain import does not work)
+def load_step(stage):
+    module_name = f"credit_step_{stage}"
+    if module_name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(module_name, os.path.join(PIPELINE_DIR, STEP_FILES[stage]))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = module
+        spec.loader.exec_module(module)
+    return sys.modules[module_name]
+
+
+# --- Sharded users generation ---
+def shard_sizes(num_rows, num_shards):
+    return [num_rows // num_shards + (1 if i < num_rows % num_shards else 0) for i in range(num_shards)]
+
+
+def shard_rng(seed, shard, num_shards):
+    # Independent, reproducible stream per shard derived from one seed
+    seed_seq = np.random.SeedSequence(seed).spawn(num_shards)[shard]
+    return np.random.RandomState(np.random.MT19937(seed_seq))
+
+
+def _generate_user_shard(num_rows, shard, num_shards, seed, reference_date, part_path):
+    users_df = load_step("users").generate_users(
+        num_rows, rng=shard_rng(seed, shard, num_shards), shard=shard, num_shards=num_shards,
+        reference_date=reference_date,
+    )
+    if part_path is None:
+        return users_df
+    credit_io.write_csv(users_df, part_path)
+    return part_path
+
+
+def generate_users_sharded(num_rows, num_shards, seed=0, reference_date=REFERENCE_DATE, processes=None, part_dir=None):
+    """
+    Generates the users table in num_shards shards on a process pool. Every shard has its own
+    RNG stream (from `seed`) and a disjoint customer_id / sk_id_curr range, so the same seed,
+    shard count and reference_date always give identical output.
+    part_dir: write each shard to users-part-NNNNN.csv there and return the paths;
+        otherwise the shards are concatenated in shard order and returned as one DataFrame.
+    """
+    reference_date = pd.Timestamp(reference_date)
+    if part_dir is not None:
+        os.makedirs(part_dir, exist_ok=True)
+    part_paths = [None if part_dir is None else os.path.join(part_dir, f"users-part-{i:05d}.csv") for i in range(num_shards)]
+
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        futures = [
+            pool.submit(_generate_user_shard, size, shard, num_shards, seed, reference_date, part_paths[shard])
+            for shard, size in enumerate(shard_sizes(num_rows, num_shards))
+        ]
+        results = [future.result() for future in futures]
+
+    if part_dir is not None:
+        return results
+    return pd.concat(results, ignore_index=True)
+
+
+# --- Stages: each takes the current tables and returns the tables it (re)produces ---
+def users_stage(tables, options):
+    step = load_step("users")
+    num_rows = step.number_of_records if options["num_rows"] is None else options["num_rows"]
+    if options["num_shards"] > 1 or options["seed"] is not None:
+        seed = 0 if options["seed"] is None else options["seed"]
+        return {"users": generate_users_sharded(num_rows, options["num_shards"], seed=seed,
+                                                reference_date=options["reference_date"])}
+    return {"users": step.generate_users(num_rows, reference_date=options["reference_date"])}
+
+
+def bureau_stage(tables, options):
+    step = load_step("bureau")
+    credits_df = step.generate_bureau_credits(tables["users"])
+    bureau_df, bureau_balance_df = step.split_bureau_tables(credits_df)
+    produced = {"bureau": bureau_df, "bureau_summary": step.summarize_credits(credits_df)}
+    if options["balance_mode"] != "history":
+        produced["bureau_balance"] = bureau_balance_df
+        return produced
+
+    # The monthly history is far too large to keep in the pipeline state, so it is streamed to its CSV here
+    os.makedirs(options["output_dir"], exist_ok=True)
+    step.write_balance_history(credits_df, os.path.join(options["output_dir"], OUTPUT_FILES["bureau_balance"]),
+                               registry=options["registry"], source=STEP_FILES["bureau"])
+    return produced
+
+
+def flags_stage(tables, options):
+    return {"users": load_step("flags").add_user_flags(tables["users"], tables["bureau_summary"])}
+
+
+def credit_card_stage(tables, options):
+    step = load_step("credit_card")
+    if options["credit_card_mode"] != "panel":
+        return {"creditcard": step.build_credit_card_table(tables["bureau"])}
+
+    # Like the bureau_balance history, the monthly panel is streamed straight to its CSV
+    os.makedirs(options["output_dir"], exist_ok=True)
+    step.write_credit_card_panel(step.credit_card_loans(tables["bureau"]),
+                                 os.path.join(options["output_dir"], OUTPUT_FILES["creditcard"]),
+                                 registry=options["registry"], source=STEP_FILES["credit_card"])
+    return {}
+
+
+def data_dictionary_stage(tables, options):
+    # Statistics of the in-memory tables; streamed tables were registered while they were written
+    registry = options["registry"]
+    for name, df in tables.items():
+        registry.reset(OUTPUT_FILES[name])
+        registry.observe(OUTPUT_FILES[name], df, options["sources"][name])
+    document = registry.save() if options["write_outputs"] else registry.to_dict()
+    return {"data_dictionary": load_step("data_dictionary").build_data_dictionary(document)}
+
+
+STAGES = [
+    ("users", users_stage),
+    ("bureau", bureau_stage),
+    ("flags", flags_stage),
+    ("credit_card", credit_card_stage),
+    ("data_dictionary", data_dictionary_stage),
+]
+
+
+# --- Checkpoints ---
+def _checkpoint_path(checkpoint_dir, stage):
+    return os.path.join(checkpoint_dir, stage)
+
+
+def save_checkpoint(checkpoint_dir, stage, produced):
+    path = _checkpoint_path(checkpoint_dir, stage)
+    os.makedirs(path, exist_ok=True)
+    for name, df in produced.items():
+        df.to_parquet(os.path.join(path, f"{name}.parquet"), index=False)
+    # Written last, so a stage interrupted mid-write is never treated as complete
+    open(os.path.join(path, "_SUCCESS"), "w").close()
+
+
+def load_checkpoint(checkpoint_dir, stage):
+    path = _checkpoint_path(checkpoint_dir, stage)
+    if not os.path.exists(os.path.join(path, "_SUCCESS")):
+        return None
+    return {f[:-len(".parquet")]: pd.read_parquet(os.path.join(path, f))
+            for f in sorted(os.listdir(path)) if f.endswith(".parquet")}
+
+
+def run_pipeline(num_rows=None, output_dir=".", checkpoint_dir=None, resume=False, write_outputs=True,
+                 num_shards=1, seed=None, reference_date=REFERENCE_DATE, balance_mode="snapshot",
+                 credit_card_mode="snapshot"):
+    """
+    Runs every stage in order and returns {table name: DataFrame}.
+    num_shards / seed: generate the users table in seeded shards on a process pool.
+    reference_date: date the users' ages are measured from.
+    balance_mode: "snapshot" or "history"; the history bureau_balance is always streamed
+        straight to output_dir and is not part of the returned tables.
+    credit_card_mode: "snapshot" or "panel"; the panel is streamed the same way.
+    checkpoint_dir: if set, each stage's tables are saved there as Parquet.
+    resume: reuse completed stage checkpoints instead of recomputing them.
+    write_outputs: write the final tables to output_dir as the usual CSV files, plus the
+        table statistics registry (data_dictionary.json).
+    """
+    options = {"num_rows": num_rows, "num_shards": num_shards, "seed": seed, "reference_date": reference_date,
+               "balance_mode": balance_mode, "credit_card_mode": credit_card_mode, "output_dir": output_dir,
+               "write_outputs": write_outputs, "sources": {},
+               "registry": TableRegistry(os.path.join(output_dir, REGISTRY_PATH))}
+    tables = {}
+    for stage, run_stage in STAGES:
+        produced = load_checkpoint(checkpoint_dir, stage) if checkpoint_dir and resume else None
+        if produced is None:
+            produced = run_stage(tables, options)
+            if checkpoint_dir:
+                save_checkpoint(checkpoint_dir, stage, produced)
+        else:
+            print(f"Resumed stage '{stage}' from checkpoint")
+        tables.update(produced)
+        options["sources"].update({name: STEP_FILES[stage] for name in produced})
+
+    if write_outputs:
+        os.makedirs(output_dir, exist_ok=True)
+        for name, df in tables.items():
+            credit_io.write_csv(df, os.path.join(output_dir, OUTPUT_FILES[name]))
+    return tables
+
+
+if __name__ == "__main__":
+    run_pipeline(checkpoint_dir=CHECKPOINT_DIR, resume=RESUME, num_shards=NUM_SHARDS, seed=SEED,
+                 reference_date=REFERENCE_DATE, balance_mode=BALANCE_MODE, credit_card_mode=CREDIT_CARD_MODE)
+    print("Credit-risk pipeline finished")
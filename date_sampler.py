@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+
+
+# --- Helper Functions ---
+def _normalize(weights):
+    weights = np.asarray(weights, dtype=float)
+    return weights / weights.sum()
+
+
+def _as_days(value):
+    # Scalars become a 0-d datetime64[D], array-likes a datetime64[D] array
+    if np.ndim(value):
+        return pd.to_datetime(np.asarray(value)).to_numpy().astype("datetime64[D]")
+    return np.datetime64(pd.Timestamp(value).to_datetime64(), "D")
+
+
+def build_calendar_probs(yearly_probs, monthly_probs, weekday_probs=None, day_probs=None):
+    """
+    Returns (days, probs) for every calendar day of the years in yearly_probs.
+    Year and month marginals follow yearly_probs/monthly_probs exactly; days
+    inside a month are uniform unless weekday (0=Monday) or day-of-month
+    weights are given, in which case they are reweighted within the month.
+    """
+    years = sorted(yearly_probs)
+    year_p = dict(zip(years, _normalize([yearly_probs[y] for y in years])))
+    months = sorted(monthly_probs)
+    month_p = dict(zip(months, _normalize([monthly_probs[m] for m in months])))
+
+    days = np.arange(np.datetime64(f"{years[0]}-01-01"), np.datetime64(f"{years[-1] + 1}-01-01"), dtype="datetime64[D]")
+    index = pd.DatetimeIndex(days)
+    days = days[index.year.isin(years) & index.month.isin(months)]
+    index = pd.DatetimeIndex(days)
+
+    # Weight of each day inside its month (uniform by default)
+    weights = np.ones(len(days))
+    if weekday_probs is not None:
+        weights *= np.array([weekday_probs.get(d, 0.0) for d in range(7)])[index.weekday]
+    if day_probs is not None:
+        weights *= np.array([day_probs.get(d, 0.0) for d in range(32)])[index.day]
+
+    month_key = index.year * 12 + index.month
+    month_totals = pd.Series(weights).groupby(month_key).transform("sum").to_numpy()
+    if np.any(month_totals == 0):
+        raise ValueError("weekday/day-of-month weights leave a month with zero probability")
+
+    probs = weights / month_totals
+    probs *= np.array([year_p[y] for y in index.year]) * np.array([month_p[m] for m in index.month])
+    return days, probs / probs.sum()
+
+
+def sample_calendar_dates(size, yearly_probs, monthly_probs, weekday_probs=None, day_probs=None, rng=None):
+    """Draws `size` dates in one call following the year/month (and optional weekday/day) weights."""
+    rng = np.random if rng is None else rng
+    days, probs = build_calendar_probs(yearly_probs, monthly_probs, weekday_probs, day_probs)
+    return days[rng.choice(len(days), size=size, p=probs)].astype("datetime64[ns]")
+
+
+def sample_dates_between(start, end, size=None, weekday_probs=None, rng=None):
+    """
+    Draws dates uniformly between start and end (both inclusive, day resolution).
+    start/end may be scalars or arrays of equal length (one range per row);
+    weekday weights are only supported for a single scalar range.
+    """
+    rng = np.random if rng is None else rng
+    start_days = _as_days(start)
+    end_days = _as_days(end)
+    if size is None:
+        size = np.broadcast(start_days, end_days).size
+
+    if weekday_probs is not None:
+        if np.ndim(start_days) or np.ndim(end_days):
+            raise ValueError("weekday_probs requires a scalar start and end")
+        days = np.arange(start_days, end_days + 1, dtype="datetime64[D]")
+        weights = np.array([weekday_probs.get(d, 0.0) for d in range(7)])[pd.DatetimeIndex(days).weekday]
+        return days[rng.choice(len(days), size=size, p=_normalize(weights))].astype("datetime64[ns]")
+
+    span = (end_days - start_days).astype(np.int64) + 1
+    offsets = np.floor(rng.random_sample(size) * span).astype(np.int64)
+    return (start_days + offsets).astype("datetime64[ns]")
+
+
+def sample_datetimes_between(start, end, size, rng=None):
+    """Draws timestamps uniformly between start and end at one-second resolution."""
+    rng = np.random if rng is None else rng
+    start = np.datetime64(pd.Timestamp(start).to_datetime64(), "s")
+    span = (np.datetime64(pd.Timestamp(end).to_datetime64(), "s") - start).astype(np.int64) + 1
+    offsets = np.floor(rng.random_sample(size) * span).astype(np.int64)
+    return (start + offsets).astype("datetime64[ns]")
+
+
+def format_dates(values, fmt):
+    """strftime for large date columns: formats each distinct date once, then gathers by position."""
+    codes, uniques = pd.factorize(pd.DatetimeIndex(values))
+    formatted = np.asarray(pd.DatetimeIndex(uniques).strftime(fmt), dtype=object)
+    out = np.full(len(codes), np.nan, dtype=object)
+    out[codes >= 0] = formatted[codes[codes >= 0]]
+    return out
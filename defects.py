@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+
+# Data-quality defect injection for generated tables. Generators build a clean
+# frame; inject_defects() then applies a list of DefectSpec as vectorized masked
+# writes (one uniform draw per row and spec), appends sampled duplicate rows in
+# one go, and returns a ground-truth log of every injected defect.
+
+
+class DefectSpec:
+    def __init__(self, column, kind, probability, where=None, **params):
+        """
+        column: column to corrupt.
+        kind: one of DEFECT_KINDS:
+            "missing"  -> NaN
+            "case"     -> upper or lower case (50/50)
+            "map"      -> mapping[value] (values not in `mapping` are kept)
+            "choice"   -> random pick from `values`
+            "randint"  -> random integer in [low, high)
+            "uniform"  -> random float in [low, high), rounded to `decimals` (default 2)
+            "value"    -> the constant `value`
+        probability: chance that an eligible row gets the defect.
+        where: predicate df -> boolean mask of the eligible rows (evaluated on the clean frame); default all rows.
+        """
+        if kind not in DEFECT_KINDS:
+            raise ValueError(f"Unknown defect kind: {kind!r}")
+        self.column = column
+        self.kind = kind
+        self.probability = probability
+        self.where = where
+        self.params = params
+
+
+# --- Defect kinds: (current values of the selected rows, spec, rng) -> new values ---
+def _missing(current, spec, rng):
+    return np.full(len(current), np.nan)
+
+
+def _case(current, spec, rng):
+    text = pd.Series(current, dtype=object).astype(str)
+    return np.where(rng.rand(len(current)) < 0.5, text.str.upper(), text.str.lower()).astype(object)
+
+
+def _map(current, spec, rng):
+    return pd.Series(current, dtype=object).replace(spec.params["mapping"]).to_numpy()
+
+
+def _choice(current, spec, rng):
+    values = np.asarray(spec.params["values"])
+    return values[rng.randint(0, len(values), size=len(current))]
+
+
+def _randint(current, spec, rng):
+    return rng.randint(spec.params["low"], spec.params["high"], size=len(current))
+
+
+def _uniform(current, spec, rng):
+    return np.round(rng.uniform(spec.params["low"], spec.params["high"], len(current)), spec.params.get("decimals", 2))
+
+
+def _value(current, spec, rng):
+    return np.full(len(current), spec.params["value"])
+
+
+DEFECT_KINDS = {
+    "missing": _missing,
+    "case": _case,
+    "map": _map,
+    "choice": _choice,
+    "randint": _randint,
+    "uniform": _uniform,
+    "value": _value,
+}
+
+
+def _writable(values, replacement):
+    # Widens the column so the replacement fits (e.g. int -> float for NaN, numbers -> object for strings)
+    if values.dtype == object:
+        return values
+    if replacement.dtype.kind in "OUS" or values.dtype.kind in "Mm":
+        return values.astype(object)
+    return values.astype(np.result_type(values.dtype, replacement.dtype), copy=False)
+
+
+def inject_defects(df, specs, rng=None, duplicates=0, key=None):
+    """
+    Applies the defect specs in order and appends `duplicates` rows sampled (with replacement)
+    from the result. Returns (defective copy of df, defect log).
+    The log has one row per defect: row (position in the returned frame), key (value of the
+    `key` column, if given), column, kind and original (the value before the defect; for
+    duplicates, the position of the copied row).
+    """
+    rng = np.random if rng is None else rng
+    n = len(df)
+    cols = {col: df[col].to_numpy(copy=True) for col in df.columns}
+    log = []
+
+    for spec in specs:
+        selected = rng.rand(n) < spec.probability
+        if spec.where is not None:
+            selected &= np.asarray(spec.where(df), dtype=bool)
+        rows = np.flatnonzero(selected)
+        current = cols[spec.column][rows]
+        replacement = np.asarray(DEFECT_KINDS[spec.kind](current, spec, rng))
+        cols[spec.column] = _writable(cols[spec.column], replacement)
+        cols[spec.column][rows] = replacement
+        log.append(pd.DataFrame({"row": rows, "column": spec.column, "kind": spec.kind,
+                                 "original": current.astype(object)}))
+
+    out = pd.DataFrame(cols, index=df.index)
+    if duplicates > 0 and n > 0:
+        source = rng.randint(0, n, size=duplicates)
+        out = pd.concat([out, out.iloc[source]], ignore_index=True)
+        log.append(pd.DataFrame({"row": np.arange(n, n + duplicates), "column": None, "kind": "duplicate",
+                                 "original": source.astype(object)}))
+
+    log = pd.concat(log, ignore_index=True) if log else pd.DataFrame(columns=["row", "column", "kind", "original"])
+    if key is not None:
+        log.insert(1, "key", out[key].to_numpy()[log["row"].to_numpy(dtype=np.int64)])
+    return out, log
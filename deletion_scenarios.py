@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+
+# Declarative deletion scenarios for the "what if data went missing" tweaks of
+# the sales data. A scenario picks a fraction of the groups (e.g. accounts)
+# that have rows matching `groups`, then deletes a fraction of each selected
+# group's rows matching `rows`. Scenarios run in order, each one only seeing
+# the rows earlier scenarios kept, and everything is dropped in one go at the end.
+
+
+class DeletionScenario:
+    def __init__(self, name, rows, groups=None, key=None, group_fraction=1.0, row_fraction=1.0):
+        """
+        name: label used in the report.
+        rows: predicate df -> boolean mask of the rows that may be deleted.
+        groups: predicate for the rows that make a group eligible (default: `rows`).
+        key: grouping column (e.g. 'Account Group ID'); None samples the rows directly.
+        group_fraction: share of the eligible groups that is selected (int(n * fraction) groups).
+        row_fraction: share of each selected group's rows that is deleted (int(n * fraction) rows).
+        """
+        self.name = name
+        self.rows = rows
+        self.groups = rows if groups is None else groups
+        self.key = key
+        self.group_fraction = group_fraction
+        self.row_fraction = row_fraction
+
+
+def _sample_within_groups(group_codes, fraction, rng):
+    # Marks int(size * fraction) random members of every group (group_codes: one code per candidate row)
+    order = np.lexsort((rng.random_sample(len(group_codes)), group_codes))
+    sorted_codes = group_codes[order]
+    group_start = np.r_[0, np.flatnonzero(np.diff(sorted_codes)) + 1]
+    group_size = np.diff(np.r_[group_start, len(sorted_codes)])
+    rank = np.arange(len(sorted_codes)) - np.repeat(group_start, group_size)
+    chosen = np.zeros(len(group_codes), dtype=bool)
+    chosen[order] = rank < np.repeat((group_size * fraction).astype(np.int64), group_size)
+    return chosen
+
+
+def deletion_mask(df, scenarios, rng=None):
+    """Returns (boolean mask of the rows to drop, per-scenario report DataFrame)."""
+    rng = np.random if rng is None else rng
+    dropped = np.zeros(len(df), dtype=bool)
+    key_codes = {}
+    report = []
+
+    for scenario in scenarios:
+        alive = ~dropped
+        targets = alive & np.asarray(scenario.rows(df), dtype=bool)
+        eligible_groups = selected_groups = None
+
+        if scenario.key is None:
+            candidates = np.flatnonzero(targets)
+            delete = candidates[_sample_within_groups(np.zeros(len(candidates), dtype=np.int64), scenario.row_fraction, rng)]
+        else:
+            if scenario.key not in key_codes:
+                key_codes[scenario.key] = pd.factorize(df[scenario.key])[0]
+            codes = key_codes[scenario.key]
+
+            # Pick int(n * group_fraction) of the groups with eligible rows
+            eligible = np.unique(codes[alive & np.asarray(scenario.groups(df), dtype=bool) & (codes >= 0)])
+            selected = rng.choice(eligible, int(len(eligible) * scenario.group_fraction), replace=False)
+            eligible_groups, selected_groups = len(eligible), len(selected)
+
+            is_selected = np.zeros(codes.max() + 1 if len(codes) else 0, dtype=bool)
+            is_selected[selected] = True
+            candidates = np.flatnonzero(targets & (codes >= 0) & is_selected[codes])  # missing keys (-1) never match
+            delete = candidates[_sample_within_groups(codes[candidates], scenario.row_fraction, rng)]
+
+        dropped[delete] = True
+        report.append({"scenario": scenario.name, "eligible_groups": eligible_groups, "selected_groups": selected_groups,
+                       "candidate_rows": len(candidates), "rows_removed": len(delete),
+                       "rows_remaining": int(len(df) - dropped.sum())})
+
+    report = pd.DataFrame(report).astype({"eligible_groups": "Int64", "selected_groups": "Int64"})
+    return dropped, report
+
+
+def apply_scenarios(df, scenarios, rng=None):
+    """Runs the scenarios and returns (remaining rows, report)."""
+    dropped, report = deletion_mask(df, scenarios, rng)
+    return df[~dropped], report
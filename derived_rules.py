@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+
+# Declarative derived columns: each column is a list of (condition, expression)
+# cases checked in order, plus a default. Conditions and expressions are
+# functions of (cols, rng) that return whole-column arrays (or scalars), where
+# cols maps column name -> NumPy array and already contains every column
+# derived by the earlier rules.
+
+
+class DerivedColumn:
+    def __init__(self, name, cases, default=np.nan):
+        """
+        name: column to (re)compute.
+        cases: [(condition, expression), ...]; condition None means "always".
+            The first case whose condition holds gives the row its value.
+        default: value for rows no case matches.
+        """
+        self.name = name
+        self.cases = list(cases)
+        self.default = default
+
+    def evaluate(self, cols, rng):
+        size = len(next(iter(cols.values())))
+        conditions, choices = [], []
+        for condition, expression in self.cases:
+            mask = np.ones(size, dtype=bool) if condition is None else condition(cols, rng)
+            conditions.append(np.broadcast_to(mask, (size,)))
+            choices.append(np.broadcast_to(expression(cols, rng), (size,)))
+        return np.select(conditions, choices, default=self.default)
+
+
+def apply_rules(df, rules, rng=None):
+    """
+    Evaluates `rules` (a list of DerivedColumn) in order over whole columns and
+    returns a copy of df with the derived columns replaced or added.
+    """
+    rng = np.random if rng is None else rng
+    cols = {col: df[col].to_numpy() for col in df.columns}
+    for rule in rules:
+        cols[rule.name] = rule.evaluate(cols, rng)
+
+    out = df.copy(deep=False)
+    for rule in rules:
+        out[rule.name] = cols[rule.name]
+    return out
+
+
+# --- Helpers for writing rules ---
+def lookup(values, table, default=None):
+    """Maps every value through the dict `table` (missing keys -> default), once per distinct value."""
+    codes, uniques = pd.factorize(np.asarray(values))
+    mapped = np.array([table.get(u, default) for u in uniques] + [default])
+    return mapped[codes]  # code -1 (missing value) picks the trailing default
+
+
+def days_between(start, end):
+    """Whole days from start to end, like (end - start).days."""
+    return (np.asarray(end, dtype="datetime64[ns]") - np.asarray(start, dtype="datetime64[ns]")) // np.timedelta64(1, "D")
+
+
+def sample_mask(mask, fraction, rng=None):
+    """Picks exactly int(count * fraction) of the rows where mask is True, without replacement."""
+    rng = np.random if rng is None else rng
+    candidates = np.flatnonzero(mask)
+    selected = np.zeros(len(mask), dtype=bool)
+    selected[rng.choice(candidates, int(len(candidates) * fraction), replace=False)] = True
+    return selected
@@ -2,17 +2,22 @@ import pandas as pd
 import numpy as np
 import random
 from datetime import datetime, timedelta
+from sales_store import read_sales
+from table_registry import register_tables
+
+# main_alt.csv, or a star-schema / partitioned Parquet directory in the layouts written by main.py
+INPUT_PATH = 'main_alt.csv'
 
 # Set random seed
 random.seed(42)
 np.random.seed(42)
 
-# Load main_alt.csv
-main_alt = pd.read_csv('main_alt.csv')
-
-# Keep only desired products
+# Keep only desired products (pushed down into the read for a partitioned dataset)
 valid_products = ['type 1 med', 'type 4 med', 'type 6 med']
-main_alt = main_alt[main_alt['Product'].isin(valid_products)]
+
+# Load main_alt.csv
+main_alt = read_sales(INPUT_PATH, columns=['Account Group ID', 'Location_ID', 'Product'],
+                      filters=[('Product', 'in', valid_products)])
 
 # Simulate or convert call_date
 if 'call_date' not in main_alt.columns:
@@ -144,4 +149,5 @@ df = pd.concat([virtual_df, non_virtual_df], ignore_index=True)
 
 # Save final dataset
 df.to_csv('final_call_data.csv', index=False)
+register_tables({'final_call_data.csv': df}, "hcp_calls.py")
 print(f"✅ Dataset saved as 'final_call_data.csv' with {len(df):,} records.")
@@ -2,6 +2,7 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import random
+from table_registry import register_tables
 
 # --- Configuration ---
 NUM_EMPLOYEES = 5000 # Number of sample employees to generate
@@ -196,5 +197,8 @@ if __name__ == "__main__":
     print("\nAttrition & Performance Fact Table Info:")
     print(attrition_performance_fact_df.info())
 
+    register_tables({employees_output_filename: employees_df,
+                     fact_output_filename: attrition_performance_fact_df}, "hr_analytics.py")
+
     print("\nAttrition counts in Fact Table:")
     print(attrition_performance_fact_df['Attrition'].value_counts())
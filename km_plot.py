@@ -1,5 +1,6 @@
 import pandas as pd
 import numpy as np
+from table_registry import register_tables
 
 # --- 1. Generate a large raw dataset (50,000 patients) ---
 num_patients = 50000
@@ -172,4 +173,5 @@ print(final_km_data_for_plot.head(20))
 # Save the combined data to a CSV file
 output_file_name = 'combined_real_world_km_data_50k_patients.csv'
 final_km_data_for_plot.to_csv(output_file_name, index=False)
+register_tables({output_file_name: final_km_data_for_plot}, "km_plot.py")
 print(f"\nAll Kaplan-Meier data (RW-OS, RW-PFS, RW-DOT) for {num_patients} patients saved to {output_file_name}")
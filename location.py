@@ -1,30 +1,30 @@
 import pandas as pd
-import random
 from faker import Faker
-import pgeocode  # For fetching ZIP code, latitude, and longitude
+from zip_index import sample_zips  # Offline ZIP code, latitude, and longitude lookup
+from table_registry import register_tables
 
 # Initialize Faker
 fake = Faker()
-nomi = pgeocode.Nominatim("us")  # Initialize pgeocode for US ZIP code lookup
+
+# Local GeoNames US.txt for building the ZIP index offline on first use (None: download via pgeocode)
+ZIP_SOURCE = None
 
 # Define the number of total records
 total_records = 2000
 
-# Function to get a valid ZIP code and related data
-def get_zip_data():
-    while True:
-        random_zip = str(random.randint(10000, 99999))  # Generate a random ZIP
-        zip_info = nomi.query_postal_code(random_zip)
-        if pd.notna(zip_info["state_code"]):
-            return zip_info["postal_code"], zip_info["place_name"], zip_info["state_code"], zip_info["state_name"]
+# Function to get valid ZIP codes and related data for all records in one draw
+def get_zip_data(size):
+    zips = sample_zips(size, source=ZIP_SOURCE)
+    return zip(zips["postal_code"], zips["place_name"], zips["state_code"].astype(str), zips["state_name"].astype(str))
 
 # Generate the data
 data = []
+zip_data = get_zip_data(total_records)
 for i in range(total_records):
     location_id = f"LOC_{i+1:04d}"  # Generate a unique Location ID
     location_name = fake.company()
     location_address = fake.street_address()
-    zipcode, city, state_abbr, state_full = get_zip_data()
+    zipcode, city, state_abbr, state_full = next(zip_data)
 
     data.append({
         "Location ID": location_id,
@@ -42,4 +42,5 @@ df = pd.DataFrame(data)
 
 
 # You can save the DataFrame to a CSV file if needed
-df.to_csv("location_data.csv", index=False)
\ No newline at end of file
+df.to_csv("location_data.csv", index=False)
+register_tables({"location_data.csv": df}, "location.py")
\ No newline at end of file
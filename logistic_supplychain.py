@@ -2,6 +2,7 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import random
+from table_registry import register_tables
 
 # --- Configuration ---
 NUM_SHIPMENTS = 10000 # Number of sample shipments to generate
@@ -197,3 +198,7 @@ if __name__ == "__main__":
     print(f"\nCarriers Dimension Table generated and saved to {carriers_output_filename}")
     print("\nFirst 5 rows of Carriers Dimension Table:")
     print(carriers_df.head())
+
+    register_tables({fact_output_filename: shipments_df, orders_output_filename: orders_df,
+                     products_output_filename: products_df, locations_output_filename: locations_df,
+                     carriers_output_filename: carriers_df}, "logistic_supplychain.py")
@@ -1,14 +1,26 @@
+import os
 import pandas as pd
 import random
 from faker import Faker
-import pgeocode  # For fetching ZIP code, latitude, and longitude
+from zip_index import sample_zips  # Offline ZIP code, latitude, and longitude lookup
 import numpy as np 
-import random
-from datetime import timedelta
+from date_sampler import sample_calendar_dates
+from category_allocator import allocate_categorical, dependent_categorical
+from sales_store import STAR_FILES, build_star_schema, write_star_schema, write_partitioned
+from table_registry import register_tables
 
 # Initialize Faker
 fake = Faker()
-nomi = pgeocode.Nominatim("us")  # Initialize pgeocode for US ZIP code lookup
+
+# Output layout: "denormalized" writes main.csv, "star" writes fact/dimension files
+# to STAR_OUTPUT_DIR, "both" writes both, "partitioned" writes main.csv's rows as a
+# year/quarter/Region partitioned Parquet dataset to PARTITIONED_OUTPUT_DIR
+OUTPUT_MODE = "denormalized"
+STAR_OUTPUT_DIR = "main_star"
+PARTITIONED_OUTPUT_DIR = "main_parquet"
+
+# Local GeoNames US.txt for building the ZIP index offline on first use (None: download via pgeocode)
+ZIP_SOURCE = None
 
 # Define the number of group IDs and records
 num_account_group_ids = 300
@@ -26,13 +38,10 @@ region_territory_map = {
     "West": ["Pacific Northwest", "Southwest", "California"]
 }
 
-# Function to get a valid ZIP code and related data
-def get_zip_data():
-    while True:
-        random_zip = str(random.randint(10000, 99999))  # Generate a random ZIP
-        zip_info = nomi.query_postal_code(random_zip)
-        if pd.notna(zip_info["state_code"]):
-            return zip_info["postal_code"], zip_info["place_name"], zip_info["state_code"], zip_info["state_name"]
+# Function to get valid ZIP codes and related data for all records in one draw
+def get_zip_data(size):
+    zips = sample_zips(size, source=ZIP_SOURCE)
+    return zip(zips["postal_code"], zips["place_name"], zips["state_code"].astype(str), zips["state_name"].astype(str))
 
 # Function to determine the region based on the state abbreviation
 def get_region(state_abbr):
@@ -68,11 +77,12 @@ def generate_vcid_reled():
 
 # Generate the data
 data = []
+zip_data = get_zip_data(total_records)
 for i in range(total_records):
     account_group_id = f"ACG_{i+1:03d}"  # Generate a unique Account Group ID based on the record number
     account_group_name = fake.company() + " Group"
     account_group_address = fake.address()
-    zipcode, city, state_abbr, state_full = get_zip_data()  # Get full zip data
+    zipcode, city, state_abbr, state_full = next(zip_data)  # Get full zip data
     vcid_reled = generate_vcid_reled()
     gpo_tier = random.choices(gpo_tiers, weights=gpo_probabilities, k=1)[0]
     region = get_region(state_abbr)
@@ -107,10 +117,7 @@ for _ in range(num_unique_records):
     else:
         num_sales_per_record.append(random.randint(300, 2000))
 
-# 2. Create an empty list to store all the rows with sale dates
-all_rows = []
-
-# 3. Iterate through each unique record and generate sale dates with unequal yearly and monthly distribution
+# 2. Generate sale dates for each unique record with unequal yearly and monthly distribution
 start_year = 2023
 end_year = 2024
 
@@ -144,38 +151,15 @@ for month in monthly_probs:
 # Create a mapping between 'Account Group ID' and the number of sales
 id_to_num_sales = dict(zip(existing_df['Account Group ID'].unique(), num_sales_per_record))
 
-for account_group_id in existing_df['Account Group ID'].unique():
-    num_sales = id_to_num_sales[account_group_id]
-    dates = []
-    for _ in range(num_sales):
-        # Choose a year based on yearly probabilities
-        chosen_year = np.random.choice(list(yearly_probs.keys()), p=list(yearly_probs.values()))
-
-        # Choose a month based on monthly probabilities
-        chosen_month = np.random.choice(list(monthly_probs.keys()), p=list(monthly_probs.values()))
-
-        # Calculate the start and end dates for the chosen month and year
-        month_start_date = pd.to_datetime(f'{chosen_year}-{chosen_month:02}-01')
-        if chosen_month == 12:
-            month_end_date = pd.to_datetime(f'{chosen_year}-12-31')
-        else:
-            month_end_date = month_start_date + pd.DateOffset(months=1) - pd.Timedelta(days=1)
-
-        month_time_difference = month_end_date - month_start_date
-        # Generate a random day within the chosen month and year
-        random_days = np.random.choice(month_time_difference.days + 1, size=1)[0] # +1 to include the end date
-        random_date = month_start_date + timedelta(days=int(random_days))
-        dates.append(random_date)
-
-    # Create a temporary dataframe for the current Account Group ID
-    temp_df = pd.DataFrame({'Account Group ID': [account_group_id] * num_sales,
-                            'sale_date': dates})
-    all_rows.append(temp_df)
-
-# 4. Concatenate all the temporary dataframes into the new DataFrame
-new_sales_df = pd.concat(all_rows, ignore_index=True)
-
-# 5. Merge the new 'sale_date' column with the existing DataFrame
+# Draw the sale dates of every account in a single vectorized call
+account_ids = np.repeat(list(id_to_num_sales.keys()), list(id_to_num_sales.values()))
+sale_dates = sample_calendar_dates(len(account_ids), yearly_probs, monthly_probs)
+
+# 3. Build the new DataFrame with one row per sale
+new_sales_df = pd.DataFrame({'Account Group ID': account_ids,
+                             'sale_date': sale_dates})
+
+# 4. Merge the new 'sale_date' column with the existing DataFrame
 # You might want to merge based on 'Account Group ID' if you want to keep other columns
 # and potentially have multiple sale dates per Account Group ID in the same row (less common for this scenario)
 # Or, if you want a separate DataFrame with 'Account Group ID' and 'sale_date':
@@ -184,8 +168,8 @@ new_sales_df = pd.concat(all_rows, ignore_index=True)
 final_df = new_sales_df
 #final_df.to_csv("main.csv", index=False)
 
-result = final_df.merge(df, how='left', on='Account Group ID')
-#result.to_csv("result.csv", index=False)
+# Sale-level attributes are added to the fact rows; the account-group dimension is joined only when writing
+result = final_df
 
 #################################################################Adding Location id to main file###################################################
 existing_df = existing_df.sample(frac=1).reset_index(drop=True)
@@ -202,8 +186,8 @@ weights = np.concatenate([
 ])
 weights /= weights.sum()  # Normalize to sum to 1
 
-# Sample with unequal probabilities
-result['Location_ID'] = np.random.choice(location_ids, size=n, p=weights)
+# Sample with unequal probabilities (kept as codes so the star output can use them as keys)
+result['Location_ID'] = pd.Categorical.from_codes(np.random.choice(len(location_ids), size=n, p=weights), location_ids)
 
 #################################################################Adding Product details###################################################
 
@@ -229,26 +213,29 @@ form_map = {
 proportions = np.random.uniform(0.1, 0.6, size=8)
 proportions = proportions / proportions.sum()  # normalize to sum to 1
 
-# Determine count per type
-counts = (proportions * n).astype(int)
-
-# Adjust to ensure total equals number of rows
-while counts.sum() < n:
-    counts[np.random.randint(0, 8)] += 1
-while counts.sum() > n:
-    idx = np.where(counts > 0)[0]
-    counts[np.random.choice(idx)] -= 1
-
-# Build the full product list
-product_list = []
-for med, count in zip(med_types, counts):
-    product_list.extend([med] * count)
-
-np.random.shuffle(product_list)
-
-# Assign to dataframe
-result['Product'] = product_list
-result['Form'] = result['Product'].map(form_map)
-result['Account Group Address'] = result['Account Group Address'].str.replace('"', '', regex=False)
-result = result.drop('Account Group Address', axis=1)
-result.to_csv("main.csv", index=False)
\ No newline at end of file
+# Assign products as a shuffled Categorical with exact per-type counts
+result['Product'] = allocate_categorical(med_types, proportions, n)
+
+# Derive the form from the product codes through a lookup table
+result['Form'] = dependent_categorical(result['Product'].cat.codes, med_types, form_map)
+
+#################################################################Writing the output###################################################
+account_dim = df.drop('Account Group Address', axis=1)
+written = {}  # output path -> table, for the data dictionary registry
+
+if OUTPUT_MODE in ("denormalized", "both", "partitioned"):
+    main_df = result[['Account Group ID', 'sale_date']].merge(account_dim, how='left', on='Account Group ID')
+    main_df[['Location_ID', 'Product', 'Form']] = result[['Location_ID', 'Product', 'Form']]
+    if OUTPUT_MODE == "partitioned":
+        write_partitioned(main_df, PARTITIONED_OUTPUT_DIR)
+        written[PARTITIONED_OUTPUT_DIR] = main_df
+    else:
+        main_df.to_csv("main.csv", index=False)
+        written["main.csv"] = main_df
+
+if OUTPUT_MODE in ("star", "both"):
+    star_tables = build_star_schema(result, account_dim)
+    write_star_schema(star_tables, STAR_OUTPUT_DIR)
+    written.update({os.path.join(STAR_OUTPUT_DIR, STAR_FILES[name]): table for name, table in star_tables.items()})
+
+register_tables(written, "main.py")
\ No newline at end of file
@@ -3,6 +3,7 @@ import numpy as np
 from datetime import datetime, timedelta
 from faker import Faker
 import random
+from table_registry import register_tables
 
 # Initialize Faker for realistic data generation
 fake = Faker()
@@ -243,6 +244,7 @@ df_fact_sales_final = df_fact_sales_final.sort_values(by='Order_ID').reset_index
 # --- Save to CSVs ---
 df_fact_sales_final.to_csv(OUTPUT_FACT_TABLE, index=False)
 df_dim_master.to_csv(OUTPUT_DIM_MASTER, index=False)
+register_tables({OUTPUT_FACT_TABLE: df_fact_sales_final, OUTPUT_DIM_MASTER: df_dim_master}, "rolling_calculation_usecase.py")
 
 
 print(f"Successfully generated data into a single fact and single dimension schema:")
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+# Per-entity rollups of child tables (e.g. accounts or transactions per
+# customer) computed in one grouped pass over the child table, instead of
+# filtering the child table once per parent row. Results can be aligned to a
+# parent key column, so parents without children still get a row.
+
+
+def _align(out, key, keys, fill_values):
+    # One row per entry of keys (repeats included, in order); missing groups get fill_values
+    if keys is None:
+        return out.reset_index()
+    dtypes = out.dtypes
+    out = out.reindex(pd.Index(np.asarray(keys), name=key))
+    for col, value in (fill_values or {}).items():
+        out[col] = out[col].fillna(value).astype(dtypes[col])  # reindexing made integer columns float
+    return out.reset_index()
+
+
+def rollup(df, key, aggregations, keys=None, fill_values=None):
+    """
+    Grouped aggregation of df by `key`.
+    aggregations: pandas named aggregations, e.g. {"Balance": ("Amount", "sum")}.
+    keys: parent keys to report on (one output row each); default: the groups found in df.
+    fill_values: {column: value} for parents without rows in df.
+    """
+    out = df.groupby(key, sort=False).agg(**aggregations)
+    return _align(out, key, keys, fill_values)
+
+
+def distinct_values(df, key, columns, keys=None, sep=", ", name="values", count_name="count"):
+    """
+    Per key: the sorted set of non-null values found in any of `columns`, joined with sep
+    (column `name`), and the size of that set (column `count_name`). Keys without rows
+    get "" and 0.
+    """
+    # Long (key, value) pairs: factorized keys and sorted value codes
+    key_values = np.concatenate([df[key].to_numpy()] * len(columns))
+    values = np.concatenate([df[col].to_numpy(dtype=object) for col in columns])
+    present = ~pd.isna(values) & ~pd.isna(key_values)
+    key_codes, key_uniques = pd.factorize(key_values[present])
+    value_codes, vocabulary = pd.factorize(values[present], sort=True)
+
+    if len(vocabulary) <= 64:
+        # Each key's set as a bitmask (bit i = i-th value of the sorted vocabulary); only the
+        # few distinct masks are turned into strings
+        masks = np.zeros(len(key_uniques), dtype=np.uint64)
+        np.bitwise_or.at(masks, key_codes, np.left_shift(np.uint64(1), value_codes.astype(np.uint64)))
+        distinct_masks, mask_codes = np.unique(masks, return_inverse=True)
+        bits = (distinct_masks[:, None] >> np.arange(len(vocabulary), dtype=np.uint64)) & np.uint64(1)
+        joined = np.array([sep.join(vocabulary[row.astype(bool)]) for row in bits], dtype=object)
+        out = pd.DataFrame({name: joined[mask_codes], count_name: bits.sum(axis=1).astype(np.int64)[mask_codes]},
+                           index=pd.Index(key_uniques, name=key))
+    else:
+        pairs = pd.DataFrame({key: key_codes, name: value_codes}).drop_duplicates().sort_values([key, name])
+        grouped = pairs.groupby(key)[name]
+        out = pd.DataFrame({name: grouped.agg(lambda codes: sep.join(vocabulary[codes])), count_name: grouped.size()})
+        out.index = pd.Index(key_uniques[out.index], name=key)
+    return _align(out, key, keys, {name: "", count_name: 0})
@@ -0,0 +1,199 @@
+import json
+import os
+import shutil
+import numpy as np
+import pandas as pd
+
+# File names used for the star-schema layout of the sales output
+STAR_FILES = {
+    "fact_sales": "fact_sales.csv",
+    "dim_account": "dim_account.csv",
+    "dim_location": "dim_location.csv",
+    "dim_product": "dim_product.csv",
+}
+ACCOUNT_ID = "Account Group ID"
+STRING_DTYPES = {"Account Zip": str}  # Read back as text so ZIP codes keep their leading zeros
+
+# Partitioned (hive-style year=/quarter=/Region= directories of Parquet files) layout of main.csv
+PARTITION_COLUMNS = ["year", "quarter", "Region"]
+COLUMN_ORDER_FILE = "_columns.json"  # "_" prefix: ignored by the Parquet dataset reader
+
+
+# --- Helper Functions ---
+def _codes(values, categories=None):
+    # Integer codes for a column, reusing Categorical codes when they already exist
+    if categories is None and isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy(), list(values.cat.categories)
+    if categories is None:
+        codes, uniques = pd.factorize(values, sort=True)
+        return codes, list(uniques)
+    return pd.Categorical(values, categories=categories).codes, list(categories)
+
+
+def build_star_schema(sales_df, account_dim):
+    """
+    Splits the sales rows (Account Group ID, sale_date, Location_ID, Product, Form)
+    into a compact fact table with integer keys plus account, location and product dimensions.
+    """
+    account_keys, _ = _codes(sales_df[ACCOUNT_ID], categories=account_dim[ACCOUNT_ID])
+    location_keys, location_ids = _codes(sales_df["Location_ID"])
+    product_keys, products = _codes(sales_df["Product"])
+
+    dim_account = account_dim.reset_index(drop=True)
+    dim_account.insert(0, "account_key", np.arange(len(dim_account), dtype=np.int32))
+
+    dim_location = pd.DataFrame({"location_key": np.arange(len(location_ids), dtype=np.int32),
+                                 "Location_ID": location_ids})
+
+    # Product attributes (Form) are constant per product, so keep one row per product key
+    dim_product = (
+        pd.DataFrame({"product_key": product_keys, "Product": sales_df["Product"].astype(str),
+                      "Form": sales_df["Form"].astype(str)})
+        .drop_duplicates("product_key")
+        .set_index("product_key")
+        .reindex(np.arange(len(products)))
+        .rename_axis("product_key")
+        .reset_index()
+    )
+    dim_product["Product"] = products
+
+    fact_sales = pd.DataFrame({
+        "account_key": account_keys.astype(np.int32),
+        "sale_date": sales_df["sale_date"].to_numpy(),
+        "location_key": location_keys.astype(np.int32),
+        "product_key": product_keys.astype(np.int16),
+    })
+    return {"fact_sales": fact_sales, "dim_account": dim_account,
+            "dim_location": dim_location, "dim_product": dim_product}
+
+
+def write_star_schema(tables, output_dir):
+    os.makedirs(output_dir, exist_ok=True)
+    for name, table in tables.items():
+        table.to_csv(os.path.join(output_dir, STAR_FILES[name]), index=False)
+
+
+def read_star_schema(star_dir):
+    tables = {}
+    for name, file_name in STAR_FILES.items():
+        parse_dates = ["sale_date"] if name == "fact_sales" else None
+        tables[name] = pd.read_csv(os.path.join(star_dir, file_name), parse_dates=parse_dates,
+                                   dtype=STRING_DTYPES if name == "dim_account" else None)
+    return tables
+
+
+def denormalize(tables, columns=None):
+    """
+    Rebuilds the flat main.csv view (same column order) from the star-schema tables.
+    Dimension attributes are gathered by key position instead of a merge;
+    pass `columns` to materialize only the columns a consumer needs.
+    """
+    fact = tables["fact_sales"]
+    dim_account = tables["dim_account"].set_index("account_key").sort_index()
+    dim_location = tables["dim_location"].set_index("location_key").sort_index()
+    dim_product = tables["dim_product"].set_index("product_key").sort_index()
+
+    account_pos = dim_account.index.get_indexer(fact["account_key"])
+    location_pos = dim_location.index.get_indexer(fact["location_key"])
+    product_pos = dim_product.index.get_indexer(fact["product_key"])
+
+    out = {ACCOUNT_ID: dim_account[ACCOUNT_ID].to_numpy()[account_pos],
+           "sale_date": fact["sale_date"].to_numpy()}
+    for col in dim_account.columns.drop(ACCOUNT_ID):
+        out[col] = dim_account[col].to_numpy()[account_pos]
+    out["Location_ID"] = dim_location["Location_ID"].to_numpy()[location_pos]
+    out["Product"] = dim_product["Product"].to_numpy()[product_pos]
+    out["Form"] = dim_product["Form"].to_numpy()[product_pos]
+
+    if columns is not None:
+        out = {col: out[col] for col in columns}
+    return pd.DataFrame(out)
+
+
+def write_partitioned(main_df, output_dir):
+    """
+    Writes the flat sales rows as a Parquet dataset partitioned by year, quarter and Region.
+    Rows are sorted by sale_date, so the per-row-group min/max statistics are tight as well.
+    """
+    sale_date = pd.to_datetime(main_df["sale_date"])
+    out = main_df.assign(year=sale_date.dt.year, quarter=sale_date.dt.quarter).sort_values("sale_date", kind="stable")
+    if is_partitioned(output_dir):
+        shutil.rmtree(output_dir)  # replace an earlier dataset completely, not just the partitions written now
+    out.to_parquet(output_dir, partition_cols=PARTITION_COLUMNS, index=False)
+    with open(os.path.join(output_dir, COLUMN_ORDER_FILE), "w") as f:
+        json.dump(list(main_df.columns), f)
+
+
+def is_partitioned(path):
+    return os.path.isdir(path) and os.path.exists(os.path.join(path, COLUMN_ORDER_FILE))
+
+
+def _partition_filters(filters):
+    # sale_date bounds also prune whole year partitions
+    pruning = []
+    for col, op, value in filters:
+        if col == "sale_date" and op in (">", ">="):
+            pruning.append(("year", ">=", pd.Timestamp(value).year))
+        elif col == "sale_date" and op in ("<", "<="):
+            pruning.append(("year", "<=", pd.Timestamp(value).year))
+    return pruning
+
+
+def _as_filter_value(col, value):
+    if col == "sale_date":
+        return [pd.Timestamp(v) for v in value] if isinstance(value, (list, tuple, set)) else pd.Timestamp(value)
+    return value
+
+
+def _filter_mask(df, filters):
+    # Same [(column, op, value), ...] conjunction as the Parquet reader, for the CSV / star inputs
+    ops = {"==": np.equal, "=": np.equal, "!=": np.not_equal, "<": np.less, "<=": np.less_equal,
+           ">": np.greater, ">=": np.greater_equal}
+    mask = np.ones(len(df), dtype=bool)
+    for col, op, value in filters:
+        value = _as_filter_value(col, value)
+        if op == "in":
+            mask &= df[col].isin(value).to_numpy()
+        elif op == "not in":
+            mask &= ~df[col].isin(value).to_numpy()
+        else:
+            mask &= np.asarray(ops[op](df[col], value), dtype=bool)
+    return mask
+
+
+def read_partitioned(path, columns=None, filters=None):
+    with open(os.path.join(path, COLUMN_ORDER_FILE)) as f:
+        column_order = json.load(f)
+    columns = column_order if columns is None else list(columns)
+    filters = [(col, op, _as_filter_value(col, value)) for col, op, value in (filters or [])]
+    # Columns the filters need are read too (and dropped again below)
+    needed = list(dict.fromkeys(columns + [col for col, _, _ in filters if col in column_order]))
+
+    df = pd.read_parquet(path, columns=needed, filters=(filters + _partition_filters(filters)) or None)
+    # Partition values and dictionary-encoded columns come back as categories; return plain values like read_csv
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype(df[col].cat.categories.dtype)
+    return df[columns].reset_index(drop=True)
+
+
+def read_sales(path, columns=None, filters=None):
+    """
+    Reads the sales data from a flat CSV (main.csv / main_alt.csv), a star-schema directory
+    or a partitioned Parquet dataset.
+    filters: [(column, op, value), ...] rows to keep (all must hold); op is one of
+        ==, !=, <, <=, >, >=, in, not in. On a partitioned dataset they are pushed down into
+        the read, so only the matching partitions and row groups are loaded.
+    """
+    if is_partitioned(path):
+        return read_partitioned(path, columns, filters)
+
+    needed = None if columns is None else list(dict.fromkeys(list(columns) + [col for col, _, _ in filters or []]))
+    if os.path.isdir(path):
+        df = denormalize(read_star_schema(path), columns=needed)
+    else:
+        df = pd.read_csv(path, usecols=needed, parse_dates=["sale_date"] if needed is None or "sale_date" in needed else None,
+                         dtype=STRING_DTYPES)
+    if filters:
+        df = df[_filter_mask(df, filters)].reset_index(drop=True)
+    return df if columns is None else df[list(columns)]
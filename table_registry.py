@@ -0,0 +1,147 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+
+# Schema and statistics of the generated tables, collected while they are
+# produced (chunk by chunk for streamed tables) instead of re-reading the
+# output files. The registry is saved as a JSON document; the Data Dictionary
+# step turns it into Data_Dictionary.csv.
+
+REGISTRY_PATH = "data_dictionary.json"
+
+
+class HyperLogLog:
+    """Mergeable distinct-count estimate over 2**p registers (p=14: ~0.8% standard error)."""
+
+    def __init__(self, p=14):
+        self.p = p
+        self.registers = np.zeros(1 << p, dtype=np.uint8)
+
+    def update(self, values):
+        values = pd.Series(values).dropna()
+        if values.empty:
+            return
+        hashes = pd.util.hash_pandas_object(values, index=False).to_numpy()
+        bucket = (hashes >> np.uint64(64 - self.p)).astype(np.int64)
+        rest = hashes & np.uint64((1 << (64 - self.p)) - 1)
+        # Rank = position of the leftmost 1-bit in the remaining 64 - p bits
+        _, bit_length = np.frexp(rest.astype(np.float64))
+        rank = (64 - self.p - bit_length + 1).astype(np.uint8)
+        np.maximum.at(self.registers, bucket, rank)
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.exp2(-self.registers.astype(np.float64)))
+        zeros = np.count_nonzero(self.registers == 0)
+        if raw <= 2.5 * m and zeros:
+            return int(round(m * np.log(m / zeros)))  # small-range (linear counting) correction
+        return int(round(raw))
+
+
+def _json_value(value):
+    # Min/max values as plain JSON types
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return None
+    if isinstance(value, (pd.Timestamp, np.datetime64)):
+        return pd.Timestamp(value).isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+class ColumnStats:
+    def __init__(self, dtype):
+        self.dtype = dtype
+        self.rows = 0
+        self.nulls = 0
+        self.minimum = None
+        self.maximum = None
+        self.distinct = HyperLogLog()
+
+    def update(self, values):
+        self.rows += len(values)
+        self.nulls += int(values.isna().sum())
+        self.distinct.update(values)
+        try:
+            low, high = values.min(), values.max()
+        except TypeError:  # mixed, unorderable values
+            return
+        if pd.isna(low):
+            return
+        self.minimum = low if self.minimum is None else min(self.minimum, low)
+        self.maximum = high if self.maximum is None else max(self.maximum, high)
+
+    def to_dict(self):
+        return {
+            "dtype": self.dtype,
+            "rows": self.rows,
+            "null_rate": round(self.nulls / self.rows, 6) if self.rows else 0.0,
+            "distinct_estimate": self.distinct.estimate(),
+            "min": _json_value(self.minimum),
+            "max": _json_value(self.maximum),
+        }
+
+
+class TableRegistry:
+    """
+    Collects per-table, per-column statistics while tables are written.
+    observe() can be called once per chunk; save() merges the tables observed here
+    into the JSON registry, replacing earlier entries of the same tables.
+    """
+
+    def __init__(self, path=REGISTRY_PATH):
+        self.path = path
+        self.tables = {}  # file name -> {"source": ..., "columns": {name: ColumnStats}}
+
+    def observe(self, file_name, chunk, source=None):
+        table = self.tables.setdefault(file_name, {"source": source, "columns": {}})
+        for col in chunk.columns:
+            if col not in table["columns"]:
+                table["columns"][col] = ColumnStats(str(chunk[col].dtype))
+            table["columns"][col].update(chunk[col])
+
+    def reset(self, file_name):
+        # Forget a table that is about to be rewritten
+        self.tables.pop(file_name, None)
+
+    def to_dict(self):
+        return {
+            file_name: {
+                "source": table["source"],
+                "rows": max((stats.rows for stats in table["columns"].values()), default=0),
+                "columns": {col: stats.to_dict() for col, stats in table["columns"].items()},
+            }
+            for file_name, table in self.tables.items()
+        }
+
+    def save(self):
+        document = load_registry(self.path)
+        document.update(self.to_dict())
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "w") as f:
+            json.dump(document, f, indent=2)
+        return document
+
+
+def register_tables(tables, source, path=REGISTRY_PATH):
+    """
+    Records whole tables written in one go ({output path: DataFrame}) and saves the registry.
+    Tables are keyed by their normalized output path (just the file name for files in the working directory).
+    """
+    registry = TableRegistry(path)
+    for output_path, df in tables.items():
+        registry.observe(os.path.normpath(output_path), df, source)
+    return registry.save()
+
+
+def load_registry(path=REGISTRY_PATH):
+    """The saved registry as {file name: {"source", "rows", "columns": {...}}} ({} if there is none yet)."""
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
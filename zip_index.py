@@ -0,0 +1,87 @@
+import os
+import numpy as np
+import pandas as pd
+
+# Compact on-disk copy of the US postal code table (built once, then reused offline)
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "us_zip_index.parquet")
+
+# Column layout of the GeoNames postal code dump (US.txt / US.zip) used by pgeocode
+GEONAMES_FIELDS = [
+    "country_code", "postal_code", "place_name", "state_name", "state_code",
+    "county_name", "county_code", "community_name", "community_code",
+    "latitude", "longitude", "accuracy"
+]
+INDEX_COLUMNS = ["postal_code", "place_name", "state_code", "state_name", "latitude", "longitude"]
+
+_loaded_indexes = {}
+
+
+# Function to read the raw GeoNames table, either from a local file or via pgeocode's download cache
+def _read_geonames(source=None):
+    if source is None:
+        import pgeocode  # Only needed (and only online) when no local source or cache exists
+        pgeocode.Nominatim("us")  # Downloads the US table into pgeocode's storage dir if missing
+        # pgeocode caches the table as a regular CSV with a header row (not the raw GeoNames layout)
+        return pd.read_csv(os.path.join(pgeocode.STORAGE_DIR, "US.txt"), dtype={"postal_code": str},
+                           usecols=INDEX_COLUMNS)
+    # A local GeoNames dump (US.txt from the GeoNames postal code export): tab-separated, no header
+    return pd.read_csv(source, sep="\t", header=None, names=GEONAMES_FIELDS,
+                       dtype={"postal_code": str}, usecols=INDEX_COLUMNS)
+
+
+def build_zip_index(source=None, cache_path=DEFAULT_CACHE_PATH):
+    """Builds the ZIP index (one row per valid postal code) and writes it as a Parquet file."""
+    raw = _read_geonames(source)
+    index = (
+        raw.dropna(subset=["state_code"])
+        .drop_duplicates(subset="postal_code")
+        .sort_values("postal_code")
+        .reset_index(drop=True)[INDEX_COLUMNS]
+    )
+    index["postal_code"] = index["postal_code"].str.zfill(5)
+    index["state_code"] = index["state_code"].astype("category")
+    index["state_name"] = index["state_name"].astype("category")
+    index["latitude"] = index["latitude"].astype(np.float32)
+    index["longitude"] = index["longitude"].astype(np.float32)
+    index.to_parquet(cache_path, index=False)
+    return index
+
+
+def load_zip_index(cache_path=DEFAULT_CACHE_PATH, source=None):
+    """Loads the cached ZIP index, building it on first use. Cached in memory per path."""
+    if cache_path not in _loaded_indexes:
+        if os.path.exists(cache_path):
+            _loaded_indexes[cache_path] = pd.read_parquet(cache_path)
+        else:
+            _loaded_indexes[cache_path] = build_zip_index(source, cache_path)
+    return _loaded_indexes[cache_path]
+
+
+def sample_zips(size, weights=None, state_weights=None, index=None, rng=None, source=None):
+    """
+    Samples `size` valid ZIP rows in one indexed draw (with replacement).
+    weights: optional per-ZIP weights, as a column name of the index (e.g. a
+        joined population column) or an array aligned with it.
+    state_weights: optional {state_code: weight} giving each state's share of
+        the draw; states not listed are excluded.
+    source: local GeoNames US.txt to build the index from on first use (offline); see load_zip_index.
+    """
+    rng = np.random if rng is None else rng
+    index = load_zip_index(source=source) if index is None else index
+
+    if weights is None:
+        p = np.ones(len(index))
+    elif isinstance(weights, str):
+        p = index[weights].fillna(0).to_numpy(dtype=float)
+    else:
+        p = np.asarray(weights, dtype=float)
+
+    if state_weights is not None:
+        states = index["state_code"].astype(str)
+        # Spread each state's weight over its ZIPs in proportion to the per-ZIP weights
+        state_totals = pd.Series(p).groupby(states.to_numpy()).transform("sum").to_numpy()
+        share = states.map(state_weights).fillna(0).to_numpy(dtype=float)
+        p = np.divide(p * share, state_totals, out=np.zeros(len(p)), where=state_totals > 0)
+
+    rows = rng.choice(len(index), size=size, p=p / p.sum())
+    return index.iloc[rows].reset_index(drop=True)